@@ -0,0 +1,518 @@
+# quick performance checks, no Excel required; run e.g. `python benchmarks.py field_init` (or without args for all)
+import asyncio
+import io
+import random
+import sys
+import time
+from functools import partial
+from typing import Callable
+
+import numpy as np
+
+import bot_strategy
+from bot_strategy import demo_bot, frontier_bot, FrontierSolver
+from engine import Grid, MineField, BatchMineField, sum_neighbors, GLYPHS, HIDDEN, FLAGGED, OPEN, FLAG
+from metrics import Metrics
+from mvc import MVC_Mines_Controller
+from mvc_async import AsyncMinesController, play_many
+from ui_excel import ExcelViewController
+from ui_ro_cli import CLIViewReadOnly
+from ui_excel_fake import FakeExcelBackend, ScriptedUser
+from ui_headless import HeadlessView
+
+
+def _best_of(func, repeat: int = 3) -> float:
+    """Returns the fastest of several runs (seconds), which is the least noisy estimate for short calls"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench_field_init(sides: tuple = (125, 250, 500, 1000), density: float = 0.15) -> None:
+    """Mine counting in MineField.complete_field_init should scale linearly: ns per cell stays flat with size"""
+    print(f"{'board':>11} {'cells':>9} {'seconds':>9} {'ns/cell':>8}")
+    for side in sides:
+        cells = side * side
+
+        def init_field():
+            field.n_mines = None  # re-initialize the same field, Grid setup is not what is measured here
+            field.complete_field_init(int(cells * density))
+            field.label_empty_regions()  # as for the first empty cell opened
+
+        field = MineField(w=side, h=side)
+        seconds = _best_of(init_field)
+        print(f"{f'{side}x{side}':>11} {cells:>9} {seconds:>9.4f} {seconds / cells * 1e9:>8.1f}")
+
+
+def bench_open_region(side: int = 2000, density: float = 0.05) -> None:
+    """Opening an empty cell reveals its whole precomputed region at once (milliseconds even for huge regions)"""
+    field = MineField(w=side, h=side)
+    start = time.perf_counter()
+    field.complete_field_init(int(side * side * density))
+    field.label_empty_regions()
+    print(f"{side}x{side} board, {density:.0%} mines: field init with region labels "
+          f"{time.perf_counter() - start:.3f} s")
+    region_sizes = np.diff(field.region_start)
+    largest = np.argmax(region_sizes)
+    cell_idx = np.flatnonzero(field.region_of == largest)[0]  # any empty cell of the region
+    start = time.perf_counter()
+    idxs = field.expand_empty_cells(cell_idx)
+    field.visible[idxs] = field.underneath[idxs]
+    print(f"opened the largest region ({region_sizes[largest]} cells) in {(time.perf_counter() - start) * 1e3:.2f} ms")
+
+
+def bench_move_rate(sides: tuple = (100, 300, 1000, 2000), moves: int = 20_000, density: float = 0.2) -> None:
+    """Flag toggles and digit opens: per-move cost (incl. the victory check) should not depend on board size"""
+    print(f"{'board':>11} {'us/move':>8}")
+    rng = np.random.default_rng(0)
+    for side in sides:
+        field = MineField(w=side, h=side)
+        field.complete_field_init(int(side * side * density))
+        digits = np.flatnonzero((field.underneath > 0) & (field.underneath < 9))
+        cells = rng.choice(digits, size=moves)  # opening a digit changes one cell, as does flagging
+        actions = rng.choice(['j', 'f', ' '], size=moves).tolist()
+        field.neighbors  # built on the first chord (opening an opened digit), not to be timed
+        start = time.perf_counter()
+        for cell_idx, action in zip(cells.tolist(), actions):
+            field.cell_action(cell_idx=cell_idx, user_input=action)
+        print(f"{f'{side}x{side}':>11} {(time.perf_counter() - start) / moves * 1e6:>8.2f}")
+
+
+def bench_cell_codes(side: int = 1000, density: float = 0.15, moves: int = 20_000) -> None:
+    """MineField's board state as uint8 cell codes, against the 4-byte strings it was before (GLYPHS of the codes, and
+     the solution as strings): bytes per cell, and whole-board scans on a played board, i.e. finding the hidden cells
+     and a victory check comparing the board with its solution"""
+    field = MineField(w=side, h=side, seed=0)
+    field.complete_field_init(int(side * side * density))
+    rng = np.random.default_rng(0)
+    for cell_idx in rng.choice(side * side, size=moves).tolist():  # open and flag cells, as a game would
+        field.cell_action(cell_idx, 'f' if field.underneath[cell_idx] == 9 else 'j')
+    solution = np.where(field.underneath == 9, HIDDEN | FLAGGED, field.underneath).astype(np.uint8)
+    print(f"{side}x{side} board, {np.count_nonzero(field.visible < 9)} cells opened")
+    print(f"{'state':>9} {'bytes/cell':>11} {'hidden ms':>10} {'victory ms':>11}")
+    for name, visible, victorious, hidden in (('codes', field.visible, solution, HIDDEN),
+                                              ('strings', GLYPHS[field.visible], GLYPHS[solution], ' ')):
+        stored = (visible, field.underneath) if name == 'codes' else (visible, victorious, field.underneath)
+        per_cell = sum(array.nbytes for array in stored) / side**2  # victories are now counted, see is_victory
+        find_hidden = _best_of(lambda: np.flatnonzero(visible == hidden))
+        check_victory = _best_of(lambda: np.array_equal(visible, victorious))
+        print(f"{name:>9} {per_cell:>11.0f} {find_hidden * 1e3:>10.2f} {check_victory * 1e3:>11.2f}")
+
+
+def bench_chunked_explore(side: int = 100_000, clicks: int = 300, density: float = 0.12, tile: int = 256) -> None:
+    """
+    Exploring a side x side ChunkedMineField (engine_chunked.py), 10^10 cells by default, far beyond what MineField
+     could hold: clicks on random cells spread over the board, opening them (empty regions across tiles) or flagging
+     mines, in memory and then in a memory-mapped tile file, which is reopened to continue the game. Memory (traced
+     allocations) should follow the tiles explored, not the board.
+    """
+    import os
+    import tempfile
+    import tracemalloc
+    from engine_chunked import ChunkedMineField
+
+    rng = np.random.default_rng(0)
+    targets = rng.integers(side * side, size=clicks).tolist()
+    print(f"{side}x{side} board, {density:.0%} mines, {tile}x{tile} tiles, {clicks} clicks")
+    print(f"{'store':>7} {'tiles':>6} {'opened':>8} {'largest':>8} {'ms/click':>9} {'MB':>7} {'B/explored cell':>16}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for path in (None, os.path.join(tmp, 'board.tiles')):
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+            field = ChunkedMineField(w=side, h=side, density=density, seed=0, tile=tile, path=path)
+            largest, start = 0, time.perf_counter()
+            for cell_idx in targets:
+                changes = field.cell_action(cell_idx, 'f' if field.underneath_at(cell_idx) == 9 else 'j')
+                largest = max(largest, changes.idxs.size)
+            seconds = time.perf_counter() - start
+            field.flush()
+            traced = tracemalloc.get_traced_memory()[0] - baseline
+            tracemalloc.stop()
+            explored = len(field.slot_of) * tile * tile
+            opened = side * side - field.n_mines - field.hidden_safe
+            print(f"{'memory' if path is None else 'mmap':>7} {len(field.slot_of):>6} {opened:>8} {largest:>8} "
+                  f"{seconds / clicks * 1e3:>9.2f} {traced / 2**20:>7.1f} {traced / explored:>16.2f}")
+        start = time.perf_counter()
+        reopened = ChunkedMineField(w=side, h=side, density=density, seed=0, tile=tile, path=path)
+        same = (reopened.hidden_safe, reopened.flags_left) == (field.hidden_safe, field.flags_left)
+        print(f"tile file {os.path.getsize(path) / 2**20:.1f} MB, reopened in {time.perf_counter() - start:.2f} s, "
+              f"{'same' if same else 'DIFFERENT'} state; a MineField would need {2 * side * side / 2**30:.0f} GB")
+
+
+def _batch_policy(field: BatchMineField, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    """Simple bot for all boards at once: opens a cell next to a digit with all its mines flagged, else flags a cell
+     next to a digit with as many hidden cells as mines left, else opens a random hidden cell"""
+    playing = np.flatnonzero(field.status == BatchMineField.PLAYING)
+    codes = field.visible[playing].reshape(-1, field.h, field.w)
+    hidden, flagged, opened = codes == HIDDEN, codes == HIDDEN | FLAGGED, codes < 9
+    hidden_nearby = sum_neighbors(hidden)
+    mines_left = codes.astype(int) - sum_neighbors(flagged)
+    safe = hidden & (sum_neighbors(opened & (hidden_nearby > 0) & (mines_left == 0)) > 0)
+    mined = hidden & (sum_neighbors(opened & (hidden_nearby > 0) & (mines_left == hidden_nearby)) > 0)
+    scores = (4 * safe + 2 * mined + hidden * rng.random(hidden.shape)).reshape(len(playing), -1)
+    best = scores.argmax(axis=1)
+    cells, actions = np.zeros(len(field.seeds), dtype=int), np.full(len(field.seeds), -1)  # -1: no move
+    cells[playing] = best
+    best_scores = scores[np.arange(len(playing)), best]
+    actions[playing] = np.where((2 <= best_scores) & (best_scores < 4), FLAG, OPEN)  # a mine but not a safe cell
+    return cells, actions
+
+
+def bench_batch_games(batch_sizes: tuple = (1, 100, 1000)) -> None:
+    """Games per second of BatchMineField (all boards resolved together) for each difficulty preset: overall, i.e.
+     with field creation and a simple vectorized bot, and for the engine alone (field creation and steps)"""
+    print(f"{'preset':>9} {'boards':>7} {'games/s':>9} {'engine':>9} {'won':>6}")
+    for difficulty, (rows, cols, mines) in MVC_Mines_Controller.presets.items():
+        for n_boards in batch_sizes:
+            rng = np.random.default_rng(difficulty)
+            start = time.perf_counter()
+            field = BatchMineField(w=cols, h=rows, mines=mines, seeds=range(n_boards))
+            engine_seconds = time.perf_counter() - start
+            while not field.game_over:
+                move = _batch_policy(field, rng)
+                step_start = time.perf_counter()
+                field.step(*move)
+                engine_seconds += time.perf_counter() - step_start
+            games_per_s = n_boards / (time.perf_counter() - start)
+            won = np.mean(field.status == BatchMineField.WON)
+            print(f"{f'{rows}x{cols}':>9} {n_boards:>7} {games_per_s:>9.0f} {n_boards / engine_seconds:>9.0f} "
+                  f"{won:>6.1%}")
+
+
+def bench_bot_move(sides: tuple = (16, 64, 256), moves: int = 300, density: float = 0.15) -> None:
+    """Bot think time per move: demo_bot rescans the grid, FrontierSolver only follows the cells each move changed"""
+    print(f"{'board':>9} {'demo_bot us':>12} {'frontier us':>12}")
+    for side in sides:
+        timings = []
+        for bot in (demo_bot, FrontierSolver()):
+            played, seconds, seed = 0, 0.0, 0
+            while played < moves:  # same games for both bots, as many as needed
+                field = MineField(w=side, h=side, seed=seed)
+                visible_grid, grid_methods = field.complete_field_init(int(side * side * density)), Grid(side, side)
+                while not field.game_over and played < moves:
+                    start = time.perf_counter()
+                    move = bot(visible_grid=visible_grid, mines_left=field.flags_left, grid_methods=grid_methods)
+                    seconds += time.perf_counter() - start
+                    changes = field.cell_action(*move)
+                    if hasattr(bot, 'observe'):
+                        start = time.perf_counter()
+                        bot.observe(changes)
+                        seconds += time.perf_counter() - start
+                    played += 1
+                seed += 1
+            timings.append(seconds / played * 1e6)
+        print(f"{f'{side}x{side}':>9} {timings[0]:>12.1f} {timings[1]:>12.1f}")
+
+
+def bench_probabilities(games: int = 100) -> None:
+    """Exact mine probabilities (bot_strategy.mine_probabilities) as computed by FrontierSolver whenever it has to
+     guess, per difficulty preset: milliseconds per call, which should stay within a few ms even on expert boards"""
+    print(f"{'preset':>9} {'calls':>6} {'p50 ms':>7} {'p95 ms':>7} {'max ms':>7} {'digits':>7}")
+    exact = bot_strategy.mine_probabilities
+    for difficulty, (rows, cols, mines) in MVC_Mines_Controller.presets.items():
+        timings, sizes = [], []
+
+        def timed(constraints, **kwargs):
+            start = time.perf_counter()
+            estimate = exact(constraints, **kwargs)
+            timings.append(time.perf_counter() - start)
+            sizes.append(len(constraints))
+            return estimate
+
+        bot_strategy.mine_probabilities = timed  # as looked up by FrontierSolver._guess
+        try:
+            for seed in range(games):
+                random.seed(seed)
+                bot, field = FrontierSolver(), MineField(w=cols, h=rows, seed=seed)
+                visible_grid, grid_methods = field.complete_field_init(mines), Grid(cols, rows)
+                while not field.game_over:
+                    bot.observe(field.cell_action(*bot(visible_grid=visible_grid, mines_left=field.flags_left,
+                                                       grid_methods=grid_methods)))
+        finally:
+            bot_strategy.mine_probabilities = exact
+        p50, p95 = np.percentile(timings, [50, 95]) * 1e3
+        print(f"{f'{rows}x{cols}':>9} {len(timings):>6} {p50:>7.2f} {p95:>7.2f} {max(timings) * 1e3:>7.2f} "
+              f"{np.mean(sizes):>7.1f}")
+
+
+def bench_excel_refresh(sides: tuple = (16, 64, 256), density: float = 0.1) -> None:
+    """COM calls and time of ExcelViewController.refresh_grid on the in-process fake Excel (ui_excel_fake.py) for the
+     first opening of a board (flood fill): written block by block vs one cell at a time"""
+    print(f"{'board':>9} {'cells':>6} {'blocks':>7} {'COM calls':>10} {'per cell':>9} {'ms':>7} {'per cell ms':>12}")
+    for side in sides:
+        field = MineField(w=side, h=side, seed=0)
+        visible_grid = field.complete_field_init(int(side * side * density))
+        field.label_empty_regions()
+        start_cell = np.flatnonzero(field.region_of == np.argmax(np.diff(field.region_start)))[0]  # largest region
+        changes = field.cell_action(int(start_cell), 'j')
+        results = []
+        for blocks in ('batched', 'per cell'):
+            backend = FakeExcelBackend(rows=side + 2, cols=side + 2)
+            view = ExcelViewController(side, side, visible_grid, backend=backend)
+            view.format_grid()
+            backend.calls.clear()
+            start = time.perf_counter()
+            if blocks == 'batched':
+                view.refresh_grid(changes)
+                n_blocks = len(view.changed_blocks(changes.idxs))
+            else:  # as before: every cell its own range and write
+                view.mirror.flat[changes.idxs] = GLYPHS[changes.values].tolist()
+                ys, xs = np.divmod(changes.idxs, side)
+                view._write_blocks([(y, x, y, x) for y, x in zip(ys.tolist(), xs.tolist())])
+            results.append((backend.com_calls(), (time.perf_counter() - start) * 1e3))
+        (calls, ms), (cell_calls, cell_ms) = results
+        print(f"{f'{side}x{side}':>9} {changes.idxs.size:>6} {n_blocks:>7} {calls:>10} {cell_calls:>9} {ms:>7.2f} "
+              f"{cell_ms:>12.2f}")
+
+
+def bench_excel_input(moves: int = 10) -> None:
+    """Input-to-render latency of a user's moves on the fake Excel (ui_excel_fake.py), an expert board: from typing
+     'j' in a safe cell until the view has written what it reveals, with worksheet change events, with polling at an
+     adaptive interval, and with polling every second (as before, so fewer moves)"""
+    print(f"{'input':>16} {'moves':>6} {'mean ms':>8} {'max ms':>8} {'grid reads':>11}")
+    rows, cols, mines = MVC_Mines_Controller.presets[3]
+    for name, events, interval, n_moves in (('change events', True, None, moves),
+                                            ('adaptive polling', False, None, moves),
+                                            ('polling 1 s', False, 1.0, max(2, moves // 4))):
+        backend = FakeExcelBackend(events=events)
+        controller = MVC_Mines_Controller(cols=cols, rows=rows, mines=mines, engine=MineField,
+                                          ui=partial(ExcelViewController, backend=backend), seed=0)
+        view, field = controller.view, controller.model
+        if interval is not None:
+            view.user_input.min_interval = view.user_input.max_interval = view.user_input.interval = interval
+
+        def script():  # a user who opens a safe hidden cell once the previous one is rendered
+            rng = np.random.default_rng(0)
+            for _ in range(n_moves):
+                hidden_safe = np.flatnonzero((field.visible == HIDDEN) & (field.underneath != 9))
+                y, x = divmod(int(rng.choice(hidden_safe)), cols)
+                yield rng.uniform(0.05, 0.15), view.y0 + y, view.x0 + x, 'j'
+                while view.mirror[y, x] in ('', ' ', 'j'):
+                    time.sleep(0.001)
+
+        user, latencies = ScriptedUser(backend, script()), []
+        user.start()
+        while len(latencies) < n_moves and not field.game_over:
+            if move := controller.get_user_move():
+                controller.apply_move(*move)
+                y, x = divmod(move[0], cols)
+                latencies.append(time.perf_counter() - user.typed_at[view.y0 + y, view.x0 + x])
+        print(f"{name:>16} {len(latencies):>6} {np.mean(latencies) * 1e3:>8.2f} {np.max(latencies) * 1e3:>8.2f} "
+              f"{backend.calls['Value2.get']:>11}")
+
+
+def bench_cli_render(games: int = 20) -> None:
+    """Bytes and time per frame of CLIViewReadOnly (headless, into a buffer) with a frame after every move of
+     frontier_bot, against a full redraw of the screen as before (plus a 'clear' subprocess and 0.5 s sleep each)"""
+    print(f"{'board':>9} {'frames':>7} {'bytes/frame':>12} {'full frame':>11} {'us/frame':>9}")
+    for rows, cols, mines in (*MVC_Mines_Controller.presets.values(), (100, 100, 1500)):
+        frames, written, seconds, full_frame = 0, 0, 0.0, 0
+        for seed in range(games):
+            random.seed(seed)
+            buffer = io.StringIO()
+            controller = MVC_Mines_Controller(cols=cols, rows=rows, mines=mines, engine=MineField,
+                                              ui=partial(CLIViewReadOnly, fps=None, out=buffer), seed=seed)
+            view, get_move = controller.view, controller._feed(frontier_bot)
+            full_frame, initial_frames, initial_bytes = view.bytes_written, view.frames, view.bytes_written
+            start = time.perf_counter()
+            while not controller.model.game_over:
+                controller.apply_move(*get_move())
+            seconds += time.perf_counter() - start  # incl. the bot's and engine's time, small in comparison
+            frames, written = frames + view.frames - initial_frames, written + view.bytes_written - initial_bytes
+        print(f"{f'{rows}x{cols}':>9} {frames:>7} {written / frames:>12.1f} {full_frame:>11} "
+              f"{seconds / frames * 1e6:>9.1f}")
+
+
+def bench_async_games(concurrency: tuple = (1, 10, 100), games: int = 100) -> None:
+    """Expert games per second of FrontierSolver bots, played one after another by MVC_Mines_Controller, and as
+     concurrent games in one event loop by AsyncMinesController (bots in the default thread pool), with how late its
+     clock ticks (10 a second) came: the event loop stays responsive while the bots think"""
+    rows, cols, mines = MVC_Mines_Controller.presets[3]
+    print(f"{'controller':>18} {'games':>6} {'games/s':>8} {'tick p50 ms':>12} {'tick max ms':>12}")
+    start = time.perf_counter()
+    for seed in range(games):
+        random.seed(seed)
+        controller = MVC_Mines_Controller(cols=cols, rows=rows, mines=mines, engine=MineField, ui=HeadlessView,
+                                          seed=seed)
+        get_move = controller._feed(FrontierSolver())
+        while not controller.model.game_over:
+            controller.apply_move(*get_move())
+    print(f"{'sequential':>18} {games:>6} {games / (time.perf_counter() - start):>8.1f} {'':>12} {'':>12}")
+    for n_concurrent in concurrency:
+        random.seed(0)
+        controllers = [AsyncMinesController(cols=cols, rows=rows, mines=mines, engine=MineField, ui=HeadlessView,
+                                            seed=seed, clock_hz=10) for seed in range(games)]
+        start = time.perf_counter()
+        for first in range(0, games, n_concurrent):
+            asyncio.run(play_many(controllers[first:first + n_concurrent], bot_factory=FrontierSolver))
+        seconds = time.perf_counter() - start
+        delays = np.concatenate([controller.tick_delays for controller in controllers]) * 1e3
+        print(f"{f'async x{n_concurrent}':>18} {games:>6} {games / seconds:>8.1f} {np.median(delays):>12.2f} "
+              f"{delays.max():>12.2f}")
+
+
+def bench_metrics(games: int = 50) -> None:
+    """Microseconds per move of whole frontier_bot games (start_game), without metrics (see metrics.py) and with them,
+     headless and with CLIViewReadOnly rendering into a buffer, and the phases' share of a move as metrics report it"""
+    rows, cols, mines = MVC_Mines_Controller.presets[3]
+
+    def play_games(ui: Callable, metrics: Metrics | None) -> None:
+        for seed in range(games):
+            random.seed(seed)
+            MVC_Mines_Controller(cols=cols, rows=rows, mines=mines, engine=MineField, ui=ui, seed=seed,
+                                 metrics=metrics).start_game(bot_strategy=frontier_bot)
+
+    print(f"{'view':>9} {'moves':>6} {'off us/move':>12} {'on us/move':>11} {'decide':>7} {'observe':>8} "
+          f"{'apply':>6} {'render':>7}")
+    for name, ui in (('headless', HeadlessView), ('cli', partial(CLIViewReadOnly, fps=None, out=io.StringIO()))):
+        metrics = Metrics()
+        start = time.perf_counter()
+        play_games(ui, metrics)
+        seconds, moves = time.perf_counter() - start, metrics.counters['moves']
+        shares = [metrics.histograms[phase + '_ns'].total / seconds / 1e7
+                  for phase in ('decide', 'observe', 'apply', 'render')]
+        off, on = _best_of(lambda: play_games(ui, None)), _best_of(lambda: play_games(ui, Metrics()))
+        print(f"{name:>9} {moves:>6} {off / moves * 1e6:>12.1f} {on / moves * 1e6:>11.1f} {shares[0]:>6.0f}% "
+              f"{shares[1]:>7.0f}% {shares[2]:>5.0f}% {shares[3]:>6.0f}%")
+
+
+def bench_imports(repeat: int = 5) -> None:
+    """Milliseconds to start Python and import what a game needs, per engine, view and bot selected in the registry
+     (see registry.py, the user's moves as bot 'user'), and the number of modules loaded, against importing all views
+     and bots as launcher.py did before (best of repeat fresh interpreters, Python's own startup shown separately)"""
+    import itertools
+    import subprocess
+    from registry import REGISTRY
+
+    def startup_ms(code: str) -> tuple[float, int]:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            modules = subprocess.run([sys.executable, '-c', code + '; import sys; print(len(sys.modules))'],
+                                     capture_output=True, text=True, check=True).stdout
+            timings.append(time.perf_counter() - start)
+        return min(timings) * 1e3, int(modules)
+
+    print(f"{'engine':>10} {'view':>9} {'bot':>9} {'ms':>7} {'modules':>8}")
+    print(f"{'python':>10} {'':>9} {'':>9} {startup_ms('pass')[0]:>7.1f} {'':>8}")
+    print(f"{'all':>10} {'all':>9} {'all':>9} "
+          f"{'{:>7.1f} {:>8}'.format(*startup_ms('import mvc, ui_ro_cli, ui_excel, ui_headless, bot_strategy'))}")
+    for engine, view, bot in itertools.product(REGISTRY['engine'], REGISTRY['view'], ['user', *REGISTRY['bot']]):
+        code = f"import mvc; from registry import load; load('engine', '{engine}'); load('view', '{view}')"
+        code += '' if bot == 'user' else f"; load('bot', '{bot}')"
+        print(f"{engine:>10} {view:>9} {bot:>9} {'{:>7.1f} {:>8}'.format(*startup_ms(code))}")
+
+
+def bench_batched_moves(games: int = 30) -> None:
+    """Expert games per second of FrontierSolver returning one move at a time, against all its certain moves at once
+     (batch, played by MVC_Mines_Controller.apply_moves and rendered once), headless, in a terminal (into a buffer) and
+     in Excel (fake, with its COM calls per game)"""
+    rows, cols, mines = MVC_Mines_Controller.presets[3]
+    views = (('headless', HeadlessView), ('cli', partial(CLIViewReadOnly, fps=None, out=io.StringIO())),
+             ('excel', None))
+    print(f"{'view':>9} {'bot':>7} {'turns':>6} {'games/s':>8} {'win rate':>9} {'COM calls':>10}")
+    for name, ui in views:
+        for batch in (False, True):
+            turns, won, com_calls, start = 0, 0, 0, time.perf_counter()
+            for seed in range(games):
+                random.seed(seed)
+                backend = FakeExcelBackend(events=False) if ui is None else None
+                controller = MVC_Mines_Controller(cols=cols, rows=rows, mines=mines, engine=MineField, seed=seed,
+                                                  ui=ui or partial(ExcelViewController, backend=backend))
+                calls = backend.com_calls() if backend else 0
+                get_move = controller._feed(FrontierSolver(batch=batch))
+                while not controller.model.game_over:
+                    move, turns = get_move(), turns + 1
+                    controller.apply_moves(move) if isinstance(move, list) else controller.apply_move(*move)
+                won += controller.model.reaction == MineField.emoticons.WON
+                com_calls += backend.com_calls() - calls if backend else 0
+            seconds, per_game = time.perf_counter() - start, f"{com_calls / games:.0f}" if ui is None else ''
+            print(f"{name:>9} {'batch' if batch else 'single':>7} {turns:>6} {games / seconds:>8.1f} "
+                  f"{won / games:>9.0%} {per_game:>10}")
+
+
+def _pair_move_by_sets(digit_idxs: np.ndarray, nearby: np.ndarray, empty_nearby: np.ndarray, needs: np.ndarray,
+                       w: int, h: int) -> tuple[int, str] | None:
+    """What demo_bot did before the pattern table, with the same arguments as patterns.forced_move: every pair of
+     frontier digits, certain if the difference of their mines left is that of their own hidden neighbors"""
+    empty_neighbors = [set(nearby[i][empty_nearby[i]].tolist()) for i in range(digit_idxs.size)]
+    for i, neighbs_a_set in enumerate(empty_neighbors):
+        for j in range(i + 1, len(empty_neighbors)):
+            neighbs_b_set = empty_neighbors[j]
+            if needs[i] - needs[j] == len(neighbs_a_set - neighbs_b_set):
+                idxs_to_flag = tuple(neighbs_a_set - neighbs_b_set)
+                idxs_to_open = tuple(neighbs_b_set - neighbs_a_set)
+                if idxs_to_flag:
+                    return random.choice(idxs_to_flag), "f"
+                if idxs_to_open:
+                    return random.choice(idxs_to_open), "j"
+    return None
+
+
+def bench_patterns(games: int = 100) -> None:
+    """demo_bot with the pattern table (patterns.py), against the set arithmetic of digit pairs it used before
+     (_pair_move_by_sets), per difficulty preset and on a larger board: share of moves answered from the
+     table (pairs), microseconds per move overall and per move that got past the single digit checks (pair stage)"""
+    lookup = bot_strategy.forced_move
+    print(f"{'board':>9} {'pairs by':>9} {'moves':>6} {'pair hits':>10} {'us/move':>8} {'us/pair stage':>14} "
+          f"{'win rate':>9}")
+    for rows, cols, mines in (*MVC_Mines_Controller.presets.values(), (48, 48, 400)):
+        for name, pairs in (('sets', _pair_move_by_sets), ('table', lookup)):
+            counts = {'moves': 0, 'staged': 0, 'hits': 0, 'stage_s': 0.0}
+
+            def counted(*args, **kwargs) -> tuple[int, str] | None:
+                start = time.perf_counter()
+                move = pairs(*args, **kwargs)
+                counts['stage_s'] += time.perf_counter() - start
+                counts['staged'], counts['hits'] = counts['staged'] + 1, counts['hits'] + (move is not None)
+                return move
+
+            bot_strategy.forced_move = counted  # as looked up by demo_bot
+            won, seconds, n_games = 0, 0.0, games if rows * cols < 1000 else games // 10
+            try:
+                for seed in range(n_games):
+                    random.seed(seed)
+                    controller = MVC_Mines_Controller(cols=cols, rows=rows, mines=mines, engine=MineField,
+                                                      ui=HeadlessView, seed=seed)
+                    get_move = controller._feed(demo_bot)
+                    while not controller.model.game_over:
+                        start = time.perf_counter()
+                        move = get_move()
+                        seconds += time.perf_counter() - start
+                        controller.apply_move(*move)
+                        counts['moves'] += 1
+                    won += controller.model.reaction == MineField.emoticons.WON
+            finally:
+                bot_strategy.forced_move = lookup
+            print(f"{f'{rows}x{cols}':>9} {name:>9} {counts['moves']:>6} {counts['hits'] / counts['moves']:>10.1%} "
+                  f"{seconds / counts['moves'] * 1e6:>8.1f} {counts['stage_s'] / counts['staged'] * 1e6:>14.1f} "
+                  f"{won / n_games:>9.0%}")
+
+
+benchmarks = {
+    'field_init': bench_field_init,
+    'open_region': bench_open_region,
+    'move_rate': bench_move_rate,
+    'cell_codes': bench_cell_codes,
+    'chunked_explore': bench_chunked_explore,
+    'batch_games': bench_batch_games,
+    'bot_move': bench_bot_move,
+    'probabilities': bench_probabilities,
+    'patterns': bench_patterns,
+    'excel_refresh': bench_excel_refresh,
+    'excel_input': bench_excel_input,
+    'cli_render': bench_cli_render,
+    'async_games': bench_async_games,
+    'batched_moves': bench_batched_moves,
+    'metrics': bench_metrics,
+    'imports': bench_imports,
+}
+
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or benchmarks:
+        print(f"== {name}")
+        benchmarks[name]()
@@ -0,0 +1,139 @@
+# no-guess boards generated ahead of time, e.g. `python board_bank.py generate --boards 1000 --bank boards`, then
+# MineField(w, h, bank=BoardBank('boards')), or `python tournament.py --bank boards`
+import argparse
+import json
+import math
+import os
+import secrets
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from bot_strategy import FrontierSolver
+from engine import Grid, MineField
+from mvc import MVC_Mines_Controller
+
+RECORD = np.dtype([('seed', '<i8'), ('start', '<u4')])  # a board: MineField seed and the cell to open first
+
+
+def safe_start(field: MineField) -> int | None:
+    """Empty cell (an opening) closest to the centre of a field, to start from, None if there is none"""
+    empty = np.flatnonzero(field.underneath == 0)
+    if not empty.size:
+        return None
+    xs, ys = field.to_coords(empty)
+    return int(empty[np.argmin((2 * xs - field.w + 1) ** 2 + (2 * ys - field.h + 1) ** 2)])
+
+
+def no_guess_start(w: int, h: int, mines: int, seed: int) -> int | None:
+    """Safe start of a seeded field, if FrontierSolver wins it from there without a single guess (i.e. only by moves
+     that are certain, see mine_probabilities), else None"""
+    field = MineField(w=w, h=h, seed=seed)
+    visible_grid, grid_methods = field.complete_field_init(mines), Grid(w=w, h=h)
+    if (start := safe_start(field)) is None:
+        return None
+    field.cell_action(start, 'j')
+    solver = FrontierSolver()
+    while not field.game_over:
+        move = solver(visible_grid=visible_grid, mines_left=field.flags_left, grid_methods=grid_methods)
+        if solver.guesses:
+            return None
+        solver.observe(field.cell_action(*move))
+    return start if field.reaction == MineField.emoticons.WON else None
+
+
+def _generate(w: int, h: int, mines: int, seeds: range) -> tuple[np.ndarray, int]:
+    """No-guess boards among the candidate seeds (in a worker process), and the number of candidates"""
+    boards = [(seed, start) for seed in seeds if (start := no_guess_start(w, h, mines, seed)) is not None]
+    return np.array(boards, dtype=RECORD), len(seeds)
+
+
+class BoardBank:
+    """
+    No-guess boards in a directory, a file per board size and number of mines, of 12-byte records (seed, safe start),
+     see RECORD. Boards are generated in a process pool (generate) and drawn from memory-mapped files (draw, board).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._boards = {}  # (w, h, mines): records, mapped on first use
+
+    def _file(self, w: int, h: int, mines: int) -> str:
+        return os.path.join(self.path, f"{w}x{h}_{mines}.bank")
+
+    def boards(self, w: int, h: int, mines: int) -> np.ndarray:
+        if (w, h, mines) not in self._boards:
+            file = self._file(w, h, mines)
+            assert os.path.exists(file) and os.path.getsize(file), f"No {w}x{h} boards with {mines} mines in the bank"
+            self._boards[w, h, mines] = np.memmap(file, dtype=RECORD, mode='r')
+        return self._boards[w, h, mines]
+
+    def board(self, w: int, h: int, mines: int, index: int) -> tuple[int, int]:
+        """The index-th board (seed and safe start), wrapping around, e.g. the same boards for the same game numbers"""
+        boards = self.boards(w, h, mines)
+        seed, start = boards[index % boards.size]
+        return int(seed), int(start)
+
+    def draw(self, w: int, h: int, mines: int) -> tuple[int, int]:
+        """A random board (seed and safe start), see MineField.complete_field_init"""
+        return self.board(w, h, mines, secrets.randbelow(self.boards(w, h, mines).size))
+
+    def generate(self, w: int, h: int, mines: int, count: int, first_seed: int | None = None,
+                 workers: int | None = None, chunk: int = 20) -> dict:
+        """Adds count no-guess boards, trying seeds from first_seed on (default: after the bank's largest), in chunks
+         of up to chunk seeds sized from the boards still missing and the share of candidates accepted so far"""
+        file = self._file(w, h, mines)
+        self._boards.pop((w, h, mines), None)  # remapped with the new boards
+        if first_seed is None:
+            first_seed = int(np.fromfile(file, dtype=RECORD)['seed'].max()) + 1 if os.path.exists(file) else 0
+        workers = workers or os.cpu_count()
+        found, accepted, tried, start_time = 0, 0, 0, time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as pool, open(file, 'ab') as f:
+            while found < count:  # in rounds of candidates for the boards still missing, at the acceptance so far
+                rate = max(accepted, 1) / max(tried, 1)  # until one is found, as if the next round's one would be
+                candidates = math.ceil((count - found) / rate)
+                size = min(chunk, math.ceil(candidates / workers))
+                seeds = [range(first_seed + tried + i * size, first_seed + tried + (i + 1) * size)
+                         for i in range(min(math.ceil(candidates / size), 4 * workers))]
+                for boards, n_tried in pool.map(partial(_generate, w, h, mines), seeds):
+                    f.write(boards[:count - found].tobytes())  # the lowest seeds, no more than asked for
+                    found, accepted, tried = min(found + boards.size, count), accepted + boards.size, tried + n_tried
+        seconds = time.perf_counter() - start_time
+        return {'board': f"{h}x{w}", 'mines': mines, 'boards': found, 'tried': tried,
+                'no_guess_share': round(accepted / tried, 3), 'seconds': round(seconds, 2),
+                'boards_per_s': round(found / seconds, 2)}
+
+
+def lookup_latency(bank: BoardBank, w: int, h: int, mines: int, draws: int = 10_000) -> dict:
+    """Microseconds to draw a board from the bank, and to set a field up with it (complete_field_init)"""
+    start = time.perf_counter()
+    for _ in range(draws):
+        bank.draw(w, h, mines)
+    draw_us = (time.perf_counter() - start) / draws * 1e6
+    start = time.perf_counter()
+    for _ in range(draws // 10):
+        MineField(w=w, h=h, bank=bank).complete_field_init(mines)
+    init_us = (time.perf_counter() - start) / (draws // 10) * 1e6
+    return {'board': f"{h}x{w}", 'mines': mines, 'bank_boards': bank.boards(w, h, mines).size,
+            'draw_us': round(draw_us, 2), 'field_init_us': round(init_us, 2)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate no-guess boards per difficulty preset, or time lookups")
+    parser.add_argument('command', choices=('generate', 'lookup'))
+    parser.add_argument('--bank', default='boards', help="directory of the bank")
+    parser.add_argument('--difficulty', type=int, nargs='+', default=[1, 2, 3], choices=MVC_Mines_Controller.presets)
+    parser.add_argument('--boards', type=int, default=100, help="boards to add per difficulty")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    bank = BoardBank(args.bank)
+    for difficulty in args.difficulty:
+        rows, cols, mines = MVC_Mines_Controller.presets[difficulty]
+        if args.command == 'generate':
+            print(json.dumps(bank.generate(cols, rows, mines, count=args.boards, workers=args.workers)))
+        else:
+            print(json.dumps(lookup_latency(bank, cols, rows, mines)))
@@ -1,8 +1,11 @@
 import numpy as np
-from random import choice
-from collections import defaultdict
+import warnings
+from collections import deque
+from math import comb
+from random import choice, choices, randrange
 
-from engine import Grid
+from engine import Grid, CellChanges, HIDDEN, FLAGGED, MARKED
+from patterns import forced_move
 
 
 def demo_bot(visible_grid: np.ndarray, mines_left: int, grid_methods: Grid) -> tuple[int, str]:
@@ -12,59 +15,50 @@ def demo_bot(visible_grid: np.ndarray, mines_left: int, grid_methods: Grid) -> t
      cell with the closest to 0 or 1 (lowest or highest), choosing randomly if > 1 with same p, unless function
      terminates early (finding certain, p=0 or p=1). Function first traverses all cells to obtain initial ps for empty
      ones, and in particular empty neighbours of cells with known digits (subtracting number of nearby flags from them).
-     It also iterates over pairs and checks sets of empty neighbours for obvious placement. It also has some simplest
-     back-tracking in case grid is filled but game isn't over (to-do: proper one).
-    :param visible_grid: numpy 2D-array, where str (object) elements represent visible minefield to a player:
-        digits '1'-'8' mean nearby N of mines, player-placed flags are 'f', and empty cells are ' ' or ''.
+     It also looks pairs of nearby digits up in a table of local patterns (see patterns.py) for cells they force,
+     which finds all that checking sets of empty neighbours of pairs did (see benchmarks.bench_patterns), and more.
+     It also has some simplest back-tracking in case grid is filled but game isn't over (to-do: proper one).
+    :param visible_grid: numpy 2D-array of cell codes (see engine.GLYPHS) representing visible minefield to a player:
+        digits 0-8 mean nearby N of mines, player-placed flags are HIDDEN | FLAGGED, and empty cells HIDDEN (or marked).
     :param mines_left: number of mines known to be left on the grid, i.e. = initial N of mines - number of placed flags
     :param grid_methods: Grid object with helper functions, see engine.py.
     :return: int cell index (from 0, which is always a top-left cell) and str 'f' flag or 'j' jump/open action.
     """
-    rowcol_arr = np.fromiter(np.ndindex(visible_grid.shape), dtype=object).reshape(visible_grid.shape)
-    coords_arr = np.fromiter(grid_methods.coordinates, dtype=object).reshape(visible_grid.shape)
-    # 2D array like grid (x, y) but with numpy (y, x)  "coordinates" (row, col)
-    probs = np.full_like(visible_grid, np.nan, dtype=float)
-    is_empty = np.isin(visible_grid, ['', ' '])
-    is_flagged = visible_grid == 'f'
+    visible = visible_grid.ravel()
+    # masks have an extra (always False) cell at the end, where padded neighbors from grid_methods.neighbors point to
+    is_empty = np.append((visible == HIDDEN) | (visible == HIDDEN | MARKED), False)
+    is_flagged = np.append(visible == HIDDEN | FLAGGED, False)
     nempty = is_empty.sum()
     if nempty == 0:  # bot filled the whole grid but game is not over -> to-do: proper back-track
-        all_flagged_coords = np.extract(is_flagged, coords_arr)
-        flagged_coord_to_open = choice(all_flagged_coords)  # random back-track for now (opens randomly one past flag)
-        return grid_methods.translate_coords(flagged_coord_to_open), "j"
-    near_digits = defaultdict(set)  # digit cell (x, y) and its N neighbors [(x_ni, y_ni)]
-    digits = {}  # will update surrounding mine number here based on actual nearby cells
-    for coord, rowcol in zip(coords_arr.flatten(), rowcol_arr.flatten()):
-        if is_empty[rowcol]:
-            p = mines_left / nempty
-            if p >= 1.0:  # early stop and flag mine if obvious
-                return grid_methods.translate_coords(coord), "f"
-            elif p <= 0.0:
-                return grid_methods.translate_coords(coord), "j"
-            probs[rowcol] = np.nanmax((p, probs[rowcol]))  # "default" or larger p
-        elif visible_grid[rowcol] != 'f':  # is digit str
-            digit = int(visible_grid[rowcol])
-            empty_neighbors = []
-            for c in grid_methods.get_neighbors(coord):
-                rc = c[::-1]  # translate coordinate (x, y) to numpy row-column index (y, x)
-                if is_empty[rc]:
-                    near_digits[rowcol].add(rc)  # all neighbors
-                    empty_neighbors.append(rc)  # current
-                elif is_flagged[rc]:
-                    digit -= 1  # mines left = the digit - known mines (flagged f)
-            digits[rowcol] = max(digit, 0)
-            for rc in empty_neighbors:
-                if (p := digit / len(empty_neighbors)) >= 1.0:
-                    return grid_methods.translate_coords(rowcol=rc), "f"
-                elif p <= 0.0:
-                    return grid_methods.translate_coords(rowcol=rc), "j"
-                probs[rc] = np.nanmax((p, probs[rc]))  # update if larger p (in case already was visited)
-
-    certain = _do_empty_neighbor_sets_of_digit_pairs(empty_neighbors=near_digits, digits=digits)
+        return int(choice(np.flatnonzero(is_flagged))), "j"  # random back-track for now (opens randomly one past flag)
+
+    digit_idxs = np.flatnonzero(visible < 9)  # row by row, as a human would scan the grid
+    nearby = grid_methods.neighbors[digit_idxs]  # each digit cell's neighbor indices
+    empty_nearby = is_empty[nearby]
+    n_empty_nearby = empty_nearby.sum(axis=1)
+    digits = visible[digit_idxs].astype(int) - is_flagged[nearby].sum(axis=1)  # mines left = digit - known (flagged f)
+
+    # early stop at the first cell (in grid order) if obvious, either from overall density or near a digit
+    p = mines_left / nempty
+    first_empty = np.argmax(is_empty) if (p >= 1.0 or p <= 0.0) else is_empty.size
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = digits / n_empty_nearby
+    obvious = np.flatnonzero((n_empty_nearby > 0) & ((ratios >= 1.0) | (ratios <= 0.0)))
+    if obvious.size and digit_idxs[obvious[0]] < first_empty:
+        first = obvious[0]
+        return int(nearby[first][empty_nearby[first]][0]), "f" if ratios[first] >= 1.0 else "j"
+    elif first_empty < is_empty.size:
+        return int(first_empty), "f" if p >= 1.0 else "j"
+
+    frontier = np.flatnonzero(n_empty_nearby)
+    certain = forced_move(digit_idxs[frontier], nearby[frontier], empty_nearby[frontier],
+                          needs=np.maximum(digits[frontier], 0), w=grid_methods.w, h=grid_methods.h)
     if certain:
-        rc, action = certain
-        return grid_methods.translate_coords(rowcol=rc), action
+        return certain
 
-    return _pick_most_probable(probs)
+    probs = np.where(is_empty, p, np.nan)  # "default" p, or larger one near a digit:
+    np.maximum.at(probs, nearby[empty_nearby], np.broadcast_to(ratios[:, None], nearby.shape)[empty_nearby])
+    return _pick_most_probable(probs[:-1].reshape(visible_grid.shape))
 
 
 def _pick_most_probable(probs: np.ndarray) -> tuple[int, str]:
@@ -75,24 +69,380 @@ def _pick_most_probable(probs: np.ndarray) -> tuple[int, str]:
     idx = choice(most_obvious_idxs)
     action = "j" if (probs.flatten()[idx] - 0.5) <= 0 else "f"  # least (most) likely to have a mine => flag (open)
 
-    return idx, action
-
-
-def _do_empty_neighbor_sets_of_digit_pairs(empty_neighbors: dict, digits: dict) -> tuple[tuple, str] | None:
-    """Iterate over every possible pair of digits (updated values given number of flags around), checking for possible
-       unfilled neighbor sets intersections (of not too distant digit cells) and return if certain (mine or not). """
-    for i, digit_a_rc in enumerate(empty_neighbors):
-        for j, digit_b_rc in enumerate(empty_neighbors):
-            if j > i:  # skip checked pairs
-                digit_a = digits[digit_a_rc]
-                digit_b = digits[digit_b_rc]
-                neighbs_a_set = empty_neighbors[digit_a_rc]
-                neighbs_b_set = empty_neighbors[digit_b_rc]
-                if (digit_a - digit_b) == len(neighbs_a_set - neighbs_b_set):
-                    rc_to_flag = tuple(neighbs_a_set - neighbs_b_set)
-                    rc_to_open = tuple(neighbs_b_set - neighbs_a_set)
-                    if rc_to_flag:
-                        return choice(rc_to_flag), "f"
-                    if rc_to_open:
-                        return choice(rc_to_open), "j"
-    return None
+    return int(idx), action
+
+
+class FrontierSolver:
+    """
+    Stateful bot with the same call signature as demo_bot. Instead of rescanning the whole grid every move, it keeps
+     the frontier (opened digits with hidden neighbours) and their constraints (hidden cells, mines among them) up to
+     date from the cells changed by each move, see observe(). Only constraints whose cells changed are re-examined,
+     alone and against constraints sharing cells with them (the same pair rule as in demo_bot), and every certain cell
+     found is queued, so most moves are answered from the queues (a few us), while observing a move costs tens of us,
+     mostly re-pairing the constraints it touched, see benchmarks.py bot_move. Guesses open the cell least likely to
+     be a mine, see _guess.
+    With batch, all queued certain moves are returned at once, as a list, see MVC_Mines_Controller.apply_moves.
+    A new game is detected by a new visible_grid object; without observe() calls (e.g. not driven by
+     MVC_Mines_Controller) changes are found by comparing with the grid seen at the previous move.
+    """
+    HIDDEN, FLAGGED, OPENED = range(3)
+    FEW_CELLS = 16  # changes up to this many cells are observed without array operations, see observe_cells
+
+    def __init__(self, batch: bool = False):
+        self.batch = batch
+        self._visible = None
+
+    def reset(self, visible_grid: np.ndarray, grid_methods: Grid) -> None:
+        self._visible, self.neighbors = visible_grid, grid_methods.neighbors
+        self.status = np.full(visible_grid.size + 1, FrontierSolver.HIDDEN)
+        self.status[-1] = FrontierSolver.OPENED  # the off-grid padding of neighbors is never hidden
+        self.n_hidden = visible_grid.size
+        self.need, self.unknown = {}, {}  # opened digit cell: mines around it still to flag, and its hidden neighbors
+        self.constrained_by = {}  # hidden cell next to opened digits: those digit cells
+        self.safe, self.mines = set(), set()  # certain, not acted upon yet
+        self.guesses = 0  # moves of this game that were not certain, e.g. none on a no-guess board (board_bank.py)
+        self._seen = np.full(visible_grid.size, HIDDEN, dtype=visible_grid.dtype)
+        self.observe_cells(np.arange(visible_grid.size), visible_grid.ravel())
+
+    def observe(self, changes: CellChanges) -> None:
+        self.observe_cells(changes.idxs, changes.values)
+
+    def observe_cells(self, idxs: np.ndarray, values: np.ndarray) -> None:
+        """Updates the constraints from changed cells (indices and cell codes). A move usually changes a few cells,
+         followed cell by cell with plain ints, which is cheaper than array operations on so few"""
+        self._seen[idxs] = values
+        self._synced = True
+        if idxs.size > FrontierSolver.FEW_CELLS:
+            statuses = np.where(values < 9, FrontierSolver.OPENED,  # cell codes, see engine.GLYPHS
+                                np.where(values == HIDDEN | FLAGGED, FrontierSolver.FLAGGED, FrontierSolver.HIDDEN))
+            moved = statuses != self.status[idxs]
+            changes = zip(idxs[moved].tolist(), self.status[idxs][moved].tolist(), statuses[moved].tolist())
+        else:
+            changes = [(idx, old, new) for idx, value in zip(idxs.tolist(), values.tolist())
+                       if (old := int(self.status[idx])) != (new := FrontierSolver.OPENED if value < 9 else
+                                                             FrontierSolver.FLAGGED if value == HIDDEN | FLAGGED else
+                                                             FrontierSolver.HIDDEN)]
+        touched, opened = set(), []
+        for idx, old, new in changes:  # update constraints that existed before these changes
+            self.status[idx] = new
+            if old == FrontierSolver.FLAGGED:  # flag removed (also if then opened): one more mine near the digits
+                for digit_idx in self.neighbors[idx].tolist():
+                    if digit_idx in self.need:
+                        self.need[digit_idx] += 1
+                        self.unknown[digit_idx].add(idx)
+                        self.constrained_by.setdefault(idx, set()).add(digit_idx)
+                        touched.add(digit_idx)
+            elif old == FrontierSolver.HIDDEN:
+                self.n_hidden -= 1
+            if new == FrontierSolver.HIDDEN:
+                self.n_hidden += 1
+                continue
+            for digit_idx in self.constrained_by.pop(idx, ()):  # opened or flagged: no longer unknown
+                self.unknown[digit_idx].discard(idx)
+                self.need[digit_idx] -= new == FrontierSolver.FLAGGED
+                touched.add(digit_idx)
+            self.safe.discard(idx)
+            self.mines.discard(idx)
+            if new == FrontierSolver.OPENED:
+                opened.append(idx)
+        for idx in opened:  # new constraints from final statuses
+            nearby = self.neighbors[idx].tolist()
+            statuses = self.status[nearby].tolist()
+            self.need[idx] = int(self._seen[idx]) - statuses.count(FrontierSolver.FLAGGED)
+            self.unknown[idx] = {near for near, status in zip(nearby, statuses) if status == FrontierSolver.HIDDEN}
+            for hidden_idx in self.unknown[idx]:
+                self.constrained_by.setdefault(hidden_idx, set()).add(idx)
+            touched.add(idx)
+        self._deduce(touched)
+
+    def _deduce(self, digit_idxs: set) -> None:
+        """Queues certain cells from the given constraints, alone and paired with the ones sharing cells with them"""
+        for digit_idx in digit_idxs:
+            cells, need = self.unknown[digit_idx], self.need[digit_idx]
+            if not cells:
+                continue
+            if need == 0:
+                self.safe.update(cells)
+            elif need == len(cells):
+                self.mines.update(cells)
+            else:
+                overlapping = set().union(*(self.constrained_by[idx] for idx in cells)) - {digit_idx}
+                for other in overlapping:  # either digit's own cells are all mines if it needs that many more
+                    other_cells, more = self.unknown[other], need - self.need[other]
+                    shared = len(cells & other_cells)  # own cells only counted, sets built only when certain
+                    if more == len(cells) - shared:
+                        self.mines.update(cells - other_cells)
+                        self.safe.update(other_cells - cells)
+                    elif -more == len(other_cells) - shared:
+                        self.mines.update(other_cells - cells)
+                        self.safe.update(cells - other_cells)
+
+    def __call__(self, visible_grid: np.ndarray, mines_left: int,
+                 grid_methods: Grid) -> tuple[int, str] | list[tuple[int, str]]:
+        if visible_grid is not self._visible:  # new game
+            self.reset(visible_grid, grid_methods)
+        elif not self._synced:
+            changed = np.flatnonzero(self._seen != visible_grid.ravel())
+            self.observe_cells(changed, visible_grid.ravel()[changed])
+        self._synced = False  # until the changes made by this move are observed
+
+        if move := self._queued_move():
+            return [move, *iter(self._queued_move, None)] if self.batch else move
+        if self.n_hidden == 0:  # bot filled the whole grid but game is not over, open randomly one past flag
+            self.guesses += 1
+            return int(choice(np.flatnonzero(self.status == FrontierSolver.FLAGGED))), "j"
+        if mines_left <= 0 or mines_left >= self.n_hidden:  # all hidden cells are safe, or mines
+            return int(np.argmax(self.status == FrontierSolver.HIDDEN)), "j" if mines_left <= 0 else "f"
+        return self._guess(mines_left)
+
+    def _queued_move(self) -> tuple[int, str] | None:
+        while self.safe:
+            if self.status[idx := self.safe.pop()] == FrontierSolver.HIDDEN:
+                return idx, "j"
+        while self.mines:
+            if self.status[idx := self.mines.pop()] == FrontierSolver.HIDDEN:
+                return idx, "f"
+        return None
+
+    def _guess(self, mines_left: int) -> tuple[int, str]:
+        """Opens the cell least likely to be a mine, by exact probabilities (see mine_probabilities), which may also
+         prove cells safe or mined that pairs of digits could not (sampled ones prove nothing, any move on them is
+         counted as a guess). If the grid is inconsistent (a wrong flag), by
+         ratios: near digits the largest ratio of mines to hidden cells around them, elsewhere of mines left to hidden
+         cells."""
+        frontier = set().union(*self.constrained_by.values())
+        estimate = mine_probabilities([(self.unknown[d], self.need[d]) for d in frontier],
+                                      n_hidden=self.n_hidden, mines_left=mines_left)
+        if estimate is not None:
+            likelihoods, interior_likelihood, exact = estimate
+            if exact:  # a sampled 0 or 1 is only likely, and a move on it a guess
+                self.safe.update(idx for idx, p in likelihoods.items() if p == 0.0)
+                self.mines.update(idx for idx, p in likelihoods.items() if p == 1.0)
+                if move := self._queued_move():
+                    return move
+        else:
+            likelihoods = {idx: max(self.need[d] / len(self.unknown[d]) for d in digit_idxs)
+                           for idx, digit_idxs in self.constrained_by.items()}
+            interior_likelihood = mines_left / self.n_hidden
+        self.guesses += 1
+        interior = self.n_hidden - len(likelihoods)
+        if likelihoods:
+            idx = min(likelihoods, key=likelihoods.get)
+            if not interior or likelihoods[idx] <= interior_likelihood:
+                return idx, "j"
+        for _ in range(100):  # random interior cell, most of the grid early on
+            idx = randrange(len(self.status) - 1)
+            if self.status[idx] == FrontierSolver.HIDDEN and idx not in self.constrained_by:
+                return idx, "j"
+        hidden = np.flatnonzero(self.status == FrontierSolver.HIDDEN)
+        return int(choice([idx for idx in hidden.tolist() if idx not in self.constrained_by])), "j"
+
+
+def mine_probabilities(constraints: list[tuple[set, int]], n_hidden: int, mines_left: int,
+                       max_states: int = 20_000, samples: int = 400) -> tuple[dict, float, bool] | None:
+    """
+    Exact mine probability of every hidden cell, given the frontier constraints (hidden cells next to a digit and the
+     number of mines among them) and the number of mines left among all hidden cells. Cells next to the same digits are
+     interchangeable and counted as a group, groups split into independent components (no constraint links them), in
+     each consistent mine placements are counted per number of mines used, see _count_placements. Components are
+     combined through the mines left, where the other (interior) hidden cells take the rest in binomial(interior, rest)
+     ways.
+    :param constraints: (set of hidden cell indices, mines among them) for each digit with hidden neighbours.
+    :param n_hidden: number of hidden (not flagged) cells on the grid, including the constrained ones.
+    :param mines_left: number of mines among them.
+    :param max_states: components needing more (memoized) partial states are sampled instead, see _sample_placements.
+    :param samples: number of random placements drawn for such a component.
+    :return: dict of frontier cell: probability, the probability for any interior cell, and whether they are exact
+     (False if some component was sampled); None if no placement fits.
+    """
+    cell_constraints = {}
+    for k, (cells, _) in enumerate(constraints):
+        for idx in cells:
+            cell_constraints.setdefault(idx, []).append(k)
+    groups = {}
+    for idx, ks in cell_constraints.items():
+        groups.setdefault(tuple(ks), []).append(idx)
+    group_keys = list(groups)
+    constraint_groups = [[] for _ in constraints]
+    for g, ks in enumerate(group_keys):
+        for k in ks:
+            constraint_groups[k].append(g)
+
+    components, unvisited, exact = [], set(range(len(group_keys))), True
+    while unvisited:
+        order = _breadth_first(unvisited.pop(), group_keys, constraint_groups)
+        unvisited.difference_update(order)
+        order = _breadth_first(order[-1], group_keys, constraint_groups)  # from an end: fewer constraints span a step
+        local = {k: i for i, k in enumerate({k: None for g in order for k in group_keys[g]})}
+        problem = ([len(groups[group_keys[g]]) for g in order], [[local[k] for k in group_keys[g]] for g in order],
+                   [constraints[k][1] for k in local])
+        if (placed := _count_placements(*problem, max_states=max_states)) is None:
+            placed, exact = _sample_placements(*problem, samples=samples), False
+        components.append(([groups[group_keys[g]] for g in order], *placed))
+
+    interior = n_hidden - len(cell_constraints)
+    ways_rest = [0] * (mines_left + 1)  # ways to place the rest in the interior, by mines used on the frontier
+    rest, ways = min(interior, mines_left), comb(interior, min(interior, mines_left))
+    for used in range(mines_left - rest, min(len(cell_constraints), mines_left) + 1):
+        ways_rest[used] = ways
+        ways = ways * rest // (interior - rest + 1)  # binomial(interior, rest - 1), without recomputing factorials
+        rest -= 1
+    prefixes = [[1]]  # products of the totals of the components before (and after) each one
+    for _, totals, _ in components:
+        prefixes.append(_convolve(prefixes[-1], totals))
+    overall = sum(ways * ways_rest[used] for used, ways in enumerate(prefixes[-1][:mines_left + 1]))
+    if overall == 0:
+        return None
+    suffix, probabilities = [1], {}
+    for j in range(len(components) - 1, -1, -1):
+        cell_groups, totals, per_group = components[j]
+        others = _convolve(prefixes[j], suffix)  # placements of all other components by mines used
+        weights = [sum(ways * ways_rest[used + own] for used, ways in enumerate(others[:mines_left + 1 - own]))
+                   if own <= mines_left and totals[own] else 0
+                   for own in range(len(totals))]  # ways to complete a placement of own mines in this component
+        for cells, by_mines in zip(cell_groups, per_group):
+            p = sum(ways * weight for ways, weight in zip(by_mines, weights)) / (overall * len(cells))
+            probabilities.update(dict.fromkeys(cells, p))
+        suffix = _convolve(suffix, totals)
+    if not interior:
+        return probabilities, 0.0, exact
+    interior_mines = sum(ways * ways_rest[used] * (mines_left - used)
+                         for used, ways in enumerate(prefixes[-1][:mines_left + 1]))
+    return probabilities, interior_mines / (interior * overall), exact  # one division of exact ints, never overflows
+
+
+def _breadth_first(start: int, group_keys: list[tuple], constraint_groups: list[list]) -> list[int]:
+    """Groups of cells linked to the start one by constraints, nearest first (a compact, local order)"""
+    order, queue, seen, used = [start], deque([start]), {start}, set()
+    while queue:
+        for k in group_keys[queue.popleft()]:
+            if k not in used:
+                used.add(k)
+                for g in constraint_groups[k]:
+                    if g not in seen:
+                        seen.add(g)
+                        order.append(g)
+                        queue.append(g)
+    return order
+
+
+def _convolve(a: list, b: list) -> list:
+    """Product of two polynomials (lists of exact int coefficients), i.e. ways to use i + j mines"""
+    product_ = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                product_[i + j] += x * y
+    return product_
+
+
+def _count_placements(sizes: list[int], memberships: list[list[int]], needs: list[int],
+                      max_states: int) -> tuple | None:
+    """
+    Counts mine placements on a component's groups of cells (in the given order) that satisfy all its constraints, by
+     number of mines used: deciding the mines of one group at a time, placements that leave the same mines still needed
+     by the constraints spanning decided and undecided groups are merged (memoized), so the work grows with the
+     frontier's width, not exponentially with its length. A forward pass counts the ways to reach each such state, a
+     backward pass the ways to complete it.
+    :param sizes: number of cells of each group.
+    :param memberships: constraints each group belongs to.
+    :param needs: mines needed by each constraint.
+    :return: totals (ways to place k mines) and for every group, mines in it summed over these ways (per k), or None if
+     some step needs more than max_states states.
+    """
+    spots = [[] for _ in needs]  # groups of each constraint, in order
+    for i, ks in enumerate(memberships):
+        for k in ks:
+            spots[k].append(i)
+    remaining, active = [{} for _ in needs], [[] for _ in range(len(sizes) + 1)]  # cells of a constraint after group i
+    for k, spots_k in enumerate(spots):
+        after = 0
+        for i in reversed(spots_k):
+            remaining[k][i] = after
+            after += sizes[i]
+        for i in range(spots_k[0] + 1, spots_k[-1] + 1):  # constraints spanning decided and undecided groups
+            active[i].append(k)
+
+    def step(i: int, state: tuple, mines: int) -> tuple | None:
+        """State (mines still needed by the active constraints) after group i, if they may still be satisfied"""
+        needed = dict(zip(active[i], state))
+        for k in memberships[i]:
+            left = needed.get(k, needs[k]) - mines
+            if left < 0 or left > remaining[k][i]:
+                return None
+            needed[k] = left
+        return tuple(needed[k] for k in active[i + 1])
+
+    # counts by number of mines are polynomials, packed into one int by `bits` per coefficient (no count of placements,
+    # even weighted by mines, needs more) so that adding them, shifting by mines and multiplying them are single int ops
+    bits = sum(sizes) + sum(sizes).bit_length() + 1
+    forward, moves = [{(): 1}], []  # ways to reach each state by mines placed so far, and the steps between states
+    for i, size in enumerate(sizes):
+        reached, moves_i = {}, []
+        for state, ways in forward[i].items():
+            for mines in range(size + 1):
+                if (after := step(i, state, mines)) is not None:
+                    reached[after] = reached.get(after, 0) + (comb(size, mines) * ways << mines * bits)
+                    moves_i.append((state, mines, after))
+        if len(reached) > max_states:
+            return None
+        forward.append(reached)
+        moves.append(moves_i)
+
+    backward = {(): 1}  # ways to complete each state, by mines placed from then on
+    per_group = [0] * len(sizes)
+    for i in range(len(sizes) - 1, -1, -1):
+        completing, into = dict.fromkeys(forward[i], 0), {}  # into: mines of group i on the way to each next state
+        for state, mines, after in moves[i]:
+            weight = comb(sizes[i], mines)
+            completing[state] += weight * backward[after] << mines * bits
+            if mines:
+                into[after] = into.get(after, 0) + (mines * weight * forward[i][state] << mines * bits)
+        per_group[i] = sum(ways * backward[after] for after, ways in into.items())
+        backward = completing
+    mask = (1 << bits) - 1
+    unpack = lambda packed: [packed >> mines * bits & mask for mines in range(sum(sizes) + 1)]
+    return unpack(backward[()]), [unpack(packed) for packed in per_group]
+
+
+def _sample_placements(sizes: list[int], memberships: list[list[int]], needs: list[int], samples: int) -> tuple:
+    """
+    Estimates _count_placements' result for a component too large to count, from random placements (Knuth's
+     estimator): group by group, a number of mines is drawn (weighted by its ways to place them) among those keeping
+     every constraint satisfiable, and a placement counts as the product of the summed ways of the options it was
+     drawn from, an unbiased estimate of the counts (scaled by samples, as the caller only needs their ratios). A
+     placement that reaches a dead end counts as zero. If every one does, warns and returns no placements (as if none
+     fit), so that the caller falls back to a cruder estimate.
+    """
+    remaining, after = [None] * len(sizes), [0] * len(needs)  # cells of a group's constraints after the group
+    for i in range(len(sizes) - 1, -1, -1):
+        remaining[i] = [after[k] for k in memberships[i]]
+        for k in memberships[i]:
+            after[k] += sizes[i]
+    ways = [[comb(size, mines) for mines in range(size + 1)] for size in sizes]
+    totals, per_group = [0] * (sum(sizes) + 1), [[0] * (sum(sizes) + 1) for _ in sizes]
+    for _ in range(samples):
+        needed, placed, weight = list(needs), [0] * len(sizes), 1
+        for i, size in enumerate(sizes):
+            options = [mines for mines in range(size + 1)
+                       if all(0 <= needed[k] - mines <= left for k, left in zip(memberships[i], remaining[i]))]
+            if not options:  # dead end
+                weight = 0
+                break
+            option_ways = [ways[i][m] for m in options]
+            placed[i] = mines = choices(options, weights=option_ways)[0]
+            weight *= sum(option_ways)
+            for k in memberships[i]:
+                needed[k] -= mines
+        if weight:
+            used = sum(placed)
+            totals[used] += weight
+            for i, mines in enumerate(placed):
+                per_group[i][used] += mines * weight
+    if not any(totals):
+        warnings.warn(f"No mine placement found in {samples} samples for a frontier of {len(sizes)} groups")
+    return totals, per_group
+
+
+frontier_bot = FrontierSolver()  # one game at a time (per process), e.g. tournament.py --bot bot_strategy:frontier_bot
+frontier_batch_bot = FrontierSolver(batch=True)  # all certain moves at once, e.g. tournament.py --bot frontier_batch
@@ -1,27 +1,67 @@
 import numpy as np
-from functools import cache
+import struct
+from functools import cached_property, lru_cache
 from itertools import product
 from numbers import Integral as int_like
 from enum import Enum
+from typing import Callable, Iterable, NamedTuple
+
+
+@lru_cache(maxsize=8)  # shared by all grids of the same size, bounded however many games are played
+def neighbor_table(w: int, h: int) -> np.ndarray:
+    """Flat indices of the 8 neighbors of every cell (one row per cell index), padded with w * h (outside the grid)"""
+    ys, xs = np.divmod(np.arange(w * h), w)
+    table = np.full((w * h, 8), w * h, dtype=np.int32 if w * h < 2**31 else np.int64)
+    for k, (dx, dy) in enumerate(xy for xy in product((-1, 0, 1), repeat=2) if xy != (0, 0)):
+        nx, ny = xs + dx, ys + dy
+        valid = (0 <= nx) & (nx < w) & (0 <= ny) & (ny < h)
+        table[valid, k] = ny[valid] * w + nx[valid]
+    table.flags.writeable = False
+    return table
 
 
 class Grid:
     def __init__(self, w: int, h: int):
         assert (w > 0 and h > 0), "incorrect grid dimensions (width and height)"
         self.dims = self.h, self.w = h, w  # rows x cols as numpy shape
-        self.coordinates = self.generate_coords(w, h)  # immutable tuples
-        self.int_coordinates = tuple(coord[1] * w + coord[0] for coord in self.coordinates)
-        # mutable set of coords as integers (indices)
-        self.remained_coords = set(self.int_coordinates)
+        self.off_grid = w * h  # padding index in the neighbor table
+
+    @cached_property
+    def coordinates(self) -> tuple:
+        return self.generate_coords(self.w, self.h)  # immutable tuples, built only if asked for
+
+    @cached_property
+    def int_coordinates(self) -> tuple:
+        return tuple(range(self.w * self.h))
+
+    @cached_property
+    def remained_coords(self) -> set:
+        return set(self.int_coordinates)  # mutable set of coords as integers (indices)
 
     @staticmethod
     def generate_coords(w, h) -> tuple:
         xs, ys = range(w), range(h)  # can add more dimensions, use numpy
         coords = list(product(xs, ys))
         coords.sort(key=lambda xy: (xy[1], xy[0]))
-        return tuple(coords)  # "human-readable" sorted tuple (memoization requires this obj to be hashable)
+        return tuple(coords)  # "human-readable" sorted tuple
+
+    @property
+    def neighbors(self) -> np.ndarray:
+        """Read-only (w * h, 8) table of neighbor indices, padded with self.off_grid; see neighbor_table"""
+        return neighbor_table(self.w, self.h)
+
+    def neighbors_of(self, cell_idx: int_like) -> np.ndarray:
+        nearby = self.neighbors[cell_idx]
+        return nearby[nearby != self.off_grid]
+
+    def to_coords(self, idxs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Batch version of translate_coords: cell indices to arrays of xs and ys"""
+        ys, xs = np.divmod(idxs, self.w)
+        return xs, ys
+
+    def to_indices(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        return np.asarray(ys) * self.w + np.asarray(xs)
 
-    @cache
     def translate_coords(self, coord: tuple | int_like = None, rowcol: tuple | None = None) -> int_like | tuple:
         if rowcol is not None:
             return self.translate_coords(coord=rowcol[::-1])  # numpy uses (y, x) for indexing; e.g. (0, 1) to 1
@@ -31,18 +71,99 @@ class Grid:
             return coord[1] * self.w + coord[0]  # (x,y) to int; e.g. (1, 0) to 1
 
     def get_neighbors(self, coord: tuple[int, int]) -> set[tuple[int, int]]:
-        moves = [-1, 1, 0]
-        neighbors00 = set(product(moves, repeat=2)) - {(0, 0)}
-        neighbors_of_coord = {(x + coord[0], y + coord[1]) for (x, y) in neighbors00}
-        valid_neighbors_of_coord = {(x, y) for (x, y) in neighbors_of_coord if (0 <= x < self.w and 0 <= y < self.h)}
-        return valid_neighbors_of_coord
+        return {divmod(idx, self.w)[::-1] for idx in self.neighbors_of(self.translate_coords(coord)).tolist()}
+
+
+def sum_neighbors(mask: np.ndarray) -> np.ndarray:
+    """Counts set cells among the 8 surrounding ones of each cell in the last two (row, col) axes of a boolean mask.
+     Equivalent to a 3x3 sliding sum (without the center) over the zero-padded mask, i.e. linear in the grid size."""
+    h, w = mask.shape[-2:]
+    padded = np.zeros(mask.shape[:-2] + (h + 2, w + 2), dtype=np.uint8)
+    padded[..., 1:-1, 1:-1] = mask
+    total = np.zeros(mask.shape, dtype=np.uint8)
+    for dy, dx in product(range(3), repeat=2):
+        if (dy, dx) != (1, 1):  # skip the cell itself
+            total += padded[..., dy:dy + h, dx:dx + w]
+    return total
+
+
+def _neighbor_pairs(mask_a: np.ndarray, mask_b: np.ndarray, offsets) -> tuple[np.ndarray, np.ndarray]:
+    """Yields flat indices (a, b) of the cells set in mask_a whose neighbor at each (dy, dx) offset is set in mask_b.
+     Masks may have leading dimensions (e.g. a batch of grids), neighbors are only looked up in the last two axes."""
+    h, w = mask_a.shape[-2:]
+    idx = np.arange(mask_a.size, dtype=np.int32 if mask_a.size < 2**31 else np.int64).reshape(mask_a.shape)
+    for dy, dx in offsets:
+        rows, cols = slice(max(0, -dy), h - max(0, dy)), slice(max(0, -dx), w - max(0, dx))
+        shifted_rows, shifted_cols = slice(max(0, dy), h - max(0, -dy)), slice(max(0, dx), w - max(0, -dx))
+        both = mask_a[..., rows, cols] & mask_b[..., shifted_rows, shifted_cols]
+        yield idx[..., rows, cols][both], idx[..., shifted_rows, shifted_cols][both]
+
+
+def label_regions(mask: np.ndarray) -> np.ndarray:
+    """Labels 8-connected regions of a boolean mask (in its last two axes) by the smallest flat index in each region,
+     via vectorized union-find (hooking roots to the smaller one, then pointer jumping). Unset cells label
+     themselves."""
+    idx = np.arange(mask.size, dtype=np.int32 if mask.size < 2**31 else np.int64).reshape(mask.shape)
+    run_starts = mask.copy()
+    run_starts[..., 1:] &= ~mask[..., :-1]
+    # start with row runs already joined (each cell points to the first one in its run), then link them to other rows
+    parent = np.where(mask, np.maximum.accumulate(np.where(run_starts, idx, 0), axis=-1), idx).ravel()
+    linked = list(_neighbor_pairs(mask, mask, offsets=((1, -1), (1, 0), (1, 1))))  # rows above are symmetric
+    a, b = np.concatenate([a for a, _ in linked]), np.concatenate([b for _, b in linked])
+    while a.size:
+        root_a, root_b = parent[a], parent[b]
+        apart = root_a != root_b
+        if not apart.any():
+            break
+        a, b, root_a, root_b = a[apart], b[apart], root_a[apart], root_b[apart]
+        np.minimum.at(parent, np.maximum(root_a, root_b), np.minimum(root_a, root_b))  # parent never exceeds index
+        while not np.array_equal(grandparent := parent[parent], parent):  # flatten trees, all point to roots
+            parent = grandparent
+    return parent
+
+
+def empty_regions(underneath: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Connected regions of empty (0) cells together with the digits bordering them, i.e. what opening any 0 reveals.
+     Returns flat arrays: region number of each cell (-1 if not 0), then CSR-like region_cells and region_start, where
+     cells of region r are region_cells[region_start[r]:region_start[r + 1]]. Leading dimensions are separate grids."""
+    is_zero = underneath == 0
+    size = is_zero.size
+    roots = label_regions(is_zero)
+    is_root = is_zero.ravel() & (roots == np.arange(size))  # the smallest index in a region
+    region_of = np.where(is_zero.ravel(), np.cumsum(is_root) - 1, -1)[roots]
+
+    offsets = [xy for xy in product((-1, 0, 1), repeat=2) if xy != (0, 0)]
+    members, regions = [np.flatnonzero(is_zero)], [region_of[is_zero.ravel()]]
+    for a, b in _neighbor_pairs(is_zero, ~is_zero, offsets=offsets):
+        members.append(b)  # digits 1-8 bordering an empty cell (mines are never next to 0)
+        regions.append(region_of[a])
+    keys = np.sort(np.concatenate(regions) * size + np.concatenate(members))  # by region, then cell
+    keys = keys[np.diff(keys, prepend=-1) != 0]  # a digit may border the same region more than once
+    return region_of, keys % size, np.searchsorted(keys // size, np.arange(is_root.sum() + 1))
+
+
+# cell codes of MineField and BatchMineField boards (uint8): 0-8 opened digit, 9 mine (shown when the game is lost),
+# plus state bits; flagged and marked cells are hidden ones
+HIDDEN, FLAGGED, MARKED, EXPLODED = 0x10, 0x20, 0x40, 0x80
+GLYPHS = np.full(256, ' ')  # codes to strings, as views show them (only views do)
+GLYPHS[:10] = [*'012345678*']
+GLYPHS[[HIDDEN | FLAGGED, HIDDEN | MARKED, 9 | FLAGGED, 9 | EXPLODED]] = ['f', '?', 'F', 'X']
+OPEN, FLAG, MARK, CLEAR = range(4)  # action codes for user inputs of MineField.cell_action:
+ACTIONS = {'j': OPEN, 'f': FLAG, '?': MARK, ' ': CLEAR, '': CLEAR}
+
+
+class CellChanges(NamedTuple):
+    """Cells changed by a move: flat indices and their new visible values (cell codes), for views to apply in bulk"""
+    idxs: np.ndarray
+    values: np.ndarray
 
 
 class MineField(Grid):
     # Game Engine; unlike Excel, here coords start from 0, 0
     emoticons = Enum('Emoticon', zip(['GAME', 'WAITS', 'WON', 'LOST'], [":)", ":o", "8)", ";("]))
 
-    def __init__(self, w: int, h: int, mines: int | None = None):
+    def __init__(self, w: int, h: int, mines: int | None = None, seed: int | None = None,
+                 bank: 'board_bank.BoardBank | None' = None):
         assert (w > 1 or h > 1), "Incorrect minefield dimensions (width and height)"
         if mines is not None:
             assert (w * h > mines), "Incorrect minefield difficulty (mines > cells)"
@@ -50,6 +171,9 @@ class MineField(Grid):
         super().__init__(w=w, h=h)
 
         self.n_mines = mines
+        self.seed = seed  # same seed, same mines (None: a new random field, or one from the bank)
+        self.bank = bank  # of no-guess boards, see board_bank.py
+        self.safe_start = None  # cell to open first, which needs no guess after it (a bank's board)
         self.flags_left = 0
         self.game_over = False
         self.reaction = MineField.emoticons.GAME
@@ -58,108 +182,295 @@ class MineField(Grid):
         assert (self.n_mines is None) ^ (mines is None), ("Already complete! " if self.n_mines else "") + \
                 f"Minefield requires the number of mines, one of {mines=}, {self.n_mines=} "
         if self.n_mines is None:
-            self.flags_left = self.n_mines = mines
+            self.n_mines = mines
+        if self.seed is None and self.bank is not None:
+            self.seed, self.safe_start = self.bank.draw(self.w, self.h, self.n_mines)
+        self.flags_left = self.n_mines
         mined = self.spread_mines(n_mines=self.n_mines)
-        self.mined_set = set(mined)  # indices
-        # this is how user sees the grid (starts blank). 0 = empty open, 1 - one mine near, 9 - mine:
-        self.visible = np.full(self.w * self.h, ' ')
-        self.underneath = np.full(self.w * self.h, 0, dtype=np.uint8)
-        self.underneath[mined] = 9  # cell at a max is surrounded by 8 mines, reserve digit 9 for an actual mine itself
-
-        for idx in mined:  # for each mine, increment cell values around it
-            mine_coord = self.translate_coords(idx)  # to-do: vectorize
-            surrounding = self.get_neighbors(mine_coord)  # valid nearby cells
-            surrounding_idxs = {self.translate_coords(xy) for xy in surrounding}
-            surrounding_idxs -= self.mined_set
-            self.underneath[list(surrounding_idxs)] += 1  # increment nearbies (up to 9, i.e. except for nearby mines)
-
-        self.victorious = np.where(self.underneath == 9, 'f', self.underneath.astype(str))  # all mines flagged
+        self.mined = np.sort(mined)
+        # this is how user sees the grid (starts hidden), as cell codes (see GLYPHS): 0 = empty open, 1 - one mine near
+        self.visible = np.full(self.w * self.h, HIDDEN, dtype=np.uint8)
+        mines_mask = np.zeros(self.w * self.h, dtype=bool)
+        mines_mask[mined] = True
+        nearby_mines = sum_neighbors(mines_mask.reshape(self.dims)).ravel()  # all cells at once, like a 3x3 kernel
+        # cell at a max is surrounded by 8 mines, reserve digit 9 for an actual mine itself
+        self.underneath = np.where(mines_mask, np.uint8(9), nearby_mines)
+
+        self.region_of = self.region_cells = self.region_start = None  # see label_empty_regions
+        # running counts instead of comparing visible to victorious after every move:
+        self.hidden_safe = self.w * self.h - self.n_mines  # cells to open
+        self.correct_flags = self.wrong_flags = 0
         view_array = self.visible.view().reshape(self.dims)
         view_array.flags.writeable = False
         return view_array
 
     def spread_mines(self, n_mines: int) -> np.ndarray:
-        rng = np.random.default_rng()
-        return rng.choice(self.int_coordinates, size=n_mines, replace=False)  # choose cells to plant
+        rng = np.random.default_rng(self.seed)
+        return rng.choice(self.w * self.h, size=n_mines, replace=False)  # choose cells to plant
 
     def is_victory(self) -> bool:
-        if np.all(self.victorious == self.visible):
+        if self.hidden_safe == 0 and self.correct_flags == self.n_mines:  # i.e. visible equals victorious
             # print("Win!")
             self.reaction = MineField.emoticons.WON
             self.game_over = True
             return True
         return False
 
-    def expand_empty_cells(self, cell_idx: int) -> list[tuple]:
-        coord = self.translate_coords(cell_idx)
-        # BFS
-        visited = set()
-        queue_like = [coord]
-        qstart = 0
-        while qstart < len(queue_like):
-            cell_coord = queue_like[qstart]
-            qstart += 1
-            if cell_coord in visited:
-                continue
-            else:
-                visited.add(cell_coord)
-                nearbies_xy = self.get_neighbors(cell_coord) - visited
-            for xy in nearbies_xy:
-                neighbor_idx = self.translate_coords(xy)
-                if self.underneath[neighbor_idx] == 0 and self.visible[neighbor_idx] == ' ':
-                    queue_like.append(xy)
-                elif self.visible[neighbor_idx] == ' ':
-                    queue_like.append(xy)  # reveal 1-8 (9 cannot happen before 1-8, guaranteed to be surrounded by 1-8)
-                    visited.add(xy)  # but do not expand, visit neighbors of 1-8
-        return queue_like
-
-    def cell_action(self, cell_idx: int, user_input: str) -> list[tuple]:
-        # assert len(user_input) < 2, "Invalid input, (f)lag, (?) mark, or (j)ust try!"
-        match self.visible[cell_idx], user_input:
-            case ('' | ' ' | 'f' | '?') as sees, 'j':  # valid cell chosen (not previously opened 0-8)
-                match self.underneath[cell_idx]:
-                    case 9:  # end game, show mines (stop time?, change cell color to red?)
-                        self.game_over = True
-                        self.reaction = MineField.emoticons.LOST
-                        self.visible[cell_idx] = 'X'  # to-do: format red bg, exploded mine
-                        revealed = [cell_idx]
-                        for cell_i in np.where(self.underneath == 9)[0]:  # reveal remaining mined cells
-                            if cell_i != cell_idx:
-                                if self.visible[cell_i] != 'f':
-                                    self.visible[cell_i] = '*'  # "not exploded" mine
-                                else:
-                                    self.visible[cell_i] = 'F'  # "not exploded" and flagged mine
-                                revealed.append(cell_i)
-                        return [self.translate_coords(c) for c in revealed]  # reveals all mines
-                    case shown_digit if shown_digit != 0:  # cell (1-8) near a mine
-                        if sees == 'f':
-                            self.flags_left += 1
-                        self.visible[cell_idx] = shown_digit  # to-do: select appropriate digit color, darken cell
-                        self.is_victory()
-                    case 0:
-                        squares = self.expand_empty_cells(cell_idx)  # to-do: set digit color (edges), darken all cells
-                        idxs = [self.translate_coords(square) for square in squares]
-                        self.visible[idxs] = self.underneath[idxs]
-                        self.is_victory()
-                        return squares
-
-            case (' ' | '?'), 'f':  # the user wants to flag the cell
-                self.visible[cell_idx] = 'f'  # add flag, increment flag counter
-                self.flags_left -= 1
+    def _count_flag(self, cell_idx: int, placed: bool) -> None:
+        change = 1 if placed else -1
+        self.flags_left -= change
+        if self.underneath[cell_idx] == 9:
+            self.correct_flags += change
+        else:
+            self.wrong_flags += change
+
+    def label_empty_regions(self) -> None:
+        """Precomputes what opening any empty (0) cell reveals, see empty_regions. Done when the first one is opened,
+         which e.g. a restored field (see restore) may never need"""
+        self.region_of, self.region_cells, self.region_start = empty_regions(self.underneath.reshape(self.dims))
+
+    def expand_empty_cells(self, cell_idx: int) -> np.ndarray:
+        """Returns indices of the cells to open around an empty cell: a lookup of its precomputed region"""
+        if self.region_of is None:
+            self.label_empty_regions()
+        region = self.region_of[cell_idx]
+        cells = self.region_cells[self.region_start[region]:self.region_start[region + 1]]
+        hidden = self.visible[cells] == HIDDEN  # flagged or marked (?) cells stay as they are
+        hidden[np.searchsorted(cells, cell_idx)] = True  # except for the opened one itself
+        return cells[hidden]
+
+    snapshot_header = struct.Struct('<4sIIIqq')  # magic, w, h, mines, seed, exploded cell (-1 if none)
+
+    def snapshot(self) -> bytes:
+        """
+        Compact state of a (seeded) game: its settings, the exploded cell if lost, and bitmasks of opened, flagged and
+         marked cells, ~3 bits per cell. All else (mines, digits, regions) is regenerated from the seed, see restore.
+        """
+        assert self.seed is not None, "Only a seeded field can be regenerated"
+        exploded = np.flatnonzero(self.visible == 9 | EXPLODED)
+        opened, marked = self.visible < 9, self.visible == HIDDEN | MARKED  # mines (9) are shown, not opened
+        flagged = (self.visible == HIDDEN | FLAGGED) | (self.visible == 9 | FLAGGED)
+        header = self.snapshot_header.pack(b'MFS1', self.w, self.h, self.n_mines, self.seed,
+                                           exploded[0] if exploded.size else -1)
+        return header + np.packbits(np.concatenate([opened, flagged, marked])).tobytes()
+
+    @classmethod
+    def restore(cls, snapshot: bytes) -> 'MineField':
+        """Field (and its initialization) as it was when the snapshot was taken"""
+        magic, w, h, mines, seed, exploded = cls.snapshot_header.unpack_from(snapshot)
+        assert magic == b'MFS1', "Not a MineField snapshot"
+        field = cls(w=w, h=h, mines=mines, seed=seed)
+        field.complete_field_init()
+        n = w * h
+        bits = np.unpackbits(np.frombuffer(snapshot, np.uint8, offset=cls.snapshot_header.size), count=3 * n)
+        opened, flagged, marked = bits.reshape(3, n).astype(bool)
+        field.visible[opened] = field.underneath[opened]
+        field.visible[flagged] = HIDDEN | FLAGGED
+        field.visible[marked] = HIDDEN | MARKED
+        field.hidden_safe -= int(np.count_nonzero(opened))
+        field.flags_left -= int(np.count_nonzero(flagged))
+        field.correct_flags = int(np.count_nonzero(flagged & (field.underneath == 9)))
+        field.wrong_flags = int(np.count_nonzero(flagged)) - field.correct_flags
+        if exploded >= 0:
+            field.explode(exploded)
+        else:
+            field.is_victory()
+        return field
+
+    def explode(self, cell_idx: int) -> np.ndarray:
+        """Ends the game lost at a mined cell and shows all mines, returns the cells changed"""
+        self.game_over = True
+        self.reaction = MineField.emoticons.LOST
+        self.visible[cell_idx] = 9 | EXPLODED  # to-do: format red bg, exploded mine
+        others = self.mined[self.mined != cell_idx]  # reveal remaining mined cells
+        # "not exploded" mine, or "not exploded" and flagged mine
+        self.visible[others] = np.where(self.visible[others] == HIDDEN | FLAGGED, 9 | FLAGGED, 9)
+        return np.append(cell_idx, others)
+
+    def chord(self, cell_idx: int) -> np.ndarray:
+        """Opens the hidden neighbors of an opened digit with as many flags around it as its digit, returns the cells
+         changed (only the digit if none). Marked (?) cells stay, as in a flood fill. A wrong flag loses the game, at
+         the mine (of the smallest index) it hid"""
+        around = np.sort(self.neighbors_of(cell_idx))
+        seen = self.visible[around]
+        targets = around[seen == HIDDEN]
+        if np.count_nonzero(seen == HIDDEN | FLAGGED) != self.visible[cell_idx] or not targets.size:
+            return np.array([cell_idx])
+        if (mined := targets[self.underneath[targets] == 9]).size:
+            return self.explode(int(mined[0]))
+        empty = targets[self.underneath[targets] == 0]
+        opened = np.unique(np.concatenate([targets, *(self.expand_empty_cells(idx) for idx in empty.tolist())]))
+        self.visible[opened] = self.underneath[opened]
+        self.hidden_safe -= opened.size
+        self.is_victory()
+        return opened
+
+    def cell_actions(self, moves: Iterable[tuple[int, str]],
+                     played: Callable[[int, str], None] | None = None) -> CellChanges:
+        """Plays many moves (see cell_action) in one call and returns all the cells they changed at once, e.g. for a
+         single render. Moves after the game is over are skipped; played(cell_idx, user_input) follows each one"""
+        changed = []
+        for cell_idx, user_input in moves:
+            if self.game_over:
+                break
+            changed.append(self.cell_action(cell_idx, user_input).idxs)
+            if played is not None:
+                played(cell_idx, user_input)
+        changed = np.unique(np.concatenate(changed)) if changed else np.array([], dtype=int)
+        return CellChanges(idxs=changed, values=self.visible[changed])
+
+    def cell_action(self, cell_idx: int, user_input: str) -> CellChanges:
+        """Plays user's input (see ACTIONS) in a cell, if valid for it; flagged and marked (?) cells are hidden ones.
+         Opening an opened digit chords, see chord. A finished game changes no more"""
+        changed = np.array([cell_idx])
+        sees, action = int(self.visible[cell_idx]), ACTIONS.get(user_input)
+        if self.game_over:
+            pass
+
+        elif action == OPEN and 0 < sees < 9:
+            changed = self.chord(cell_idx)
+
+        elif not sees & HIDDEN or action is None:  # opened cell (0-8) or invalid input: do nothing
+            pass
+
+        elif action == OPEN:  # valid cell chosen (not previously opened 0-8)
+            if sees == HIDDEN | FLAGGED:
+                self._count_flag(cell_idx, placed=False)
+            match self.underneath[cell_idx]:
+                case 9:  # end game, show mines (stop time?, change cell color to red?)
+                    changed = self.explode(cell_idx)  # reveals all mines
+                case shown_digit if shown_digit != 0:  # cell (1-8) near a mine
+                    self.visible[cell_idx] = shown_digit  # to-do: select appropriate digit color, darken cell
+                    self.hidden_safe -= 1
+                    self.is_victory()
+                case 0:
+                    changed = self.expand_empty_cells(cell_idx)  # to-do: set digit color (edges), darken cells
+                    self.visible[changed] = self.underneath[changed]  # never mines
+                    self.hidden_safe -= changed.size
+                    self.is_victory()
+
+        elif action == FLAG:  # the user wants to flag the cell
+            if sees != HIDDEN | FLAGGED:
+                self.visible[cell_idx] = HIDDEN | FLAGGED  # add flag, increment flag counter
+                self._count_flag(cell_idx, placed=True)
                 self.is_victory()
 
-            case 'f', (' ' | '' | '?') as replaces_flag:
-                self.flags_left += 1
-                if replaces_flag:
-                    self.visible[cell_idx] = replaces_flag or ' '
+        else:  # user wants to mark the cell with '?' or clear it (sets to empty space), also replacing a flag
+            if sees == HIDDEN | FLAGGED:
+                self._count_flag(cell_idx, placed=False)
+            self.visible[cell_idx] = HIDDEN | MARKED if action == MARK else HIDDEN
+
+        return CellChanges(idxs=changed, values=self.visible[changed])
+
+
+class BatchMineField(Grid):
+    """Many games of the same size and difficulty played in lockstep as stacked arrays (a row of cell codes per board).
+     Each step takes one move per board and resolves all of them with array operations. Games match MineField ones
+     created with the same seeds, move for move (and cell code for cell code)."""
+    PLAYING, WON, LOST = range(3)
+
+    def __init__(self, w: int, h: int, mines: int, seeds: list[int]):
+        assert (w > 1 or h > 1), "Incorrect minefield dimensions (width and height)"
+        assert (w * h > mines), "Incorrect minefield difficulty (mines > cells)"
+        super().__init__(w=w, h=h)
+        self.n_mines, self.seeds = mines, list(seeds)
+        n_boards = len(self.seeds)
+
+        mines_mask = np.zeros((n_boards, w * h), dtype=bool)
+        for board, seed in enumerate(self.seeds):  # exactly the mines of a single game
+            mines_mask[board, MineField(w=w, h=h, seed=seed).spread_mines(n_mines=mines)] = True
+        nearby_mines = sum_neighbors(mines_mask.reshape(n_boards, h, w)).reshape(n_boards, -1)
+        self.underneath = np.where(mines_mask, np.uint8(9), nearby_mines)
+        self.visible = np.full((n_boards, w * h), HIDDEN, dtype=np.uint8)
+        # regions are numbered across all boards, cells by their index in the flattened (boards x cells) arrays
+        self.region_of, self.region_cells, self.region_start = empty_regions(self.underneath.reshape(-1, h, w))
+
+        self.flags_left = np.full(n_boards, mines)
+        self.hidden_safe = np.full(n_boards, w * h - mines)
+        self.correct_flags, self.wrong_flags = np.zeros(n_boards, dtype=int), np.zeros(n_boards, dtype=int)
+        self.status = np.full(n_boards, BatchMineField.PLAYING)
+
+    @property
+    def game_over(self) -> bool:
+        return bool(np.all(self.status != BatchMineField.PLAYING))
+
+    def visible_as_str(self) -> np.ndarray:
+        return GLYPHS[self.visible]
+
+    def _count_flags(self, boards: np.ndarray, on_mine: np.ndarray, change: int) -> None:
+        self.flags_left[boards] -= change
+        self.correct_flags[boards[on_mine]] += change
+        self.wrong_flags[boards[~on_mine]] += change
+
+    def _chord_targets(self, boards: np.ndarray, at: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Boards and flattened indices of the cells that chords on opened digits open, see MineField.chord"""
+        n_cells = self.w * self.h
+        visible = np.append(self.visible.reshape(-1), np.uint8(0))  # padded: off-grid neighbors are never hidden
+        around = self.neighbors[at % n_cells]
+        around = np.where(around < n_cells, around + (boards * n_cells)[:, None], visible.size - 1)
+        seen = visible[around]
+        satisfied = np.count_nonzero(seen == HIDDEN | FLAGGED, axis=1) == visible[at]
+        targets = (seen == HIDDEN) & satisfied[:, None]
+        return np.broadcast_to(boards[:, None], around.shape)[targets], around[targets]
+
+    def step(self, cells: np.ndarray, actions: np.ndarray) -> CellChanges:
+        """Applies a move (cell index and OPEN/FLAG/MARK/CLEAR action code) on every board still played, opening an
+         opened digit chords (see MineField.chord). Negative actions skip a board. Returns changes with indices into
+         the flattened (boards x cells) visible array."""
+        n_cells = self.w * self.h
+        visible, underneath = self.visible.reshape(-1), self.underneath.reshape(-1)  # views, written through
+        boards = np.flatnonzero((self.status == BatchMineField.PLAYING) & (np.asarray(actions) >= 0))
+        actions = np.asarray(actions)[boards]
+        at = boards * n_cells + np.asarray(cells)[boards]
+        sees, content = visible[at], underneath[at]
+        hidden, on_mine = (sees & HIDDEN) > 0, content == 9
+
+        flagging = hidden & (actions == FLAG) & (sees != HIDDEN | FLAGGED)
+        unflagging = (sees == HIDDEN | FLAGGED) & (actions != FLAG)  # opened, marked or cleared
+        self._count_flags(boards[flagging], on_mine[flagging], change=1)
+        self._count_flags(boards[unflagging], on_mine[unflagging], change=-1)
+        visible[at[flagging]] = HIDDEN | FLAGGED
+        visible[at[hidden & (actions == MARK)]] = HIDDEN | MARKED
+        visible[at[hidden & (actions == CLEAR)]] = HIDDEN
+        changed = [at[hidden & (actions != OPEN)]]
+
+        opening = hidden & (actions == OPEN)
+        chording = (actions == OPEN) & (sees > 0) & (sees < 9)  # an opened digit, see MineField.chord
+        open_boards, open_at = boards[opening], at[opening]
+        if chording.any():
+            chord_boards, chord_at = self._chord_targets(boards[chording], at[chording])
+            open_boards, open_at = np.append(open_boards, chord_boards), np.append(open_at, chord_at)
 
-            case (' ' | '' | '?'), '?':  # user wants to mark non-'f' cell with '?' (cannot mark already opened cell)
-                self.visible[cell_idx] = '?'
+        mined = underneath[open_at] == 9  # a board opening a mine (first by index) opens nothing else
+        order = np.lexsort((open_at[mined], open_boards[mined]))
+        lost, first = np.unique(open_boards[mined][order], return_index=True)
+        lost_at = open_at[mined][order][first]
+        safe = ~np.isin(open_boards, lost)
+        open_boards, open_at = open_boards[safe], open_at[safe]
+        content = underneath[open_at]
+        empty = content == 0  # open the precomputed regions of all such cells at once
+        starts, ends = self.region_start[self.region_of[open_at[empty]]], \
+            self.region_start[self.region_of[open_at[empty]] + 1]
+        sizes = ends - starts
+        offsets = np.arange(np.sum(sizes)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        members = self.region_cells[np.repeat(starts, sizes) + offsets]
+        members = np.unique(np.concatenate((open_at[~empty], members[visible[members] == HIDDEN],
+                                            open_at[empty][visible[open_at[empty]] != HIDDEN])))
+        visible[members] = underneath[members]  # digits (1-8) near a mine, and regions, never mines
+        self.hidden_safe -= np.bincount(members // n_cells, minlength=len(self.seeds))
+        changed.append(members)
 
-            case (' ' | '' | '?'), (' ' | ''):  # user wants to clear the ? or already empty cell (sets to empty space)
-                self.visible[cell_idx] = ' '
+        if lost.size:  # reveal all mines, as MineField does
+            mines = self.underneath[lost] == 9
+            flagged = self.visible[lost] == HIDDEN | FLAGGED
+            self.visible[lost] = np.where(mines, np.where(flagged, 9 | FLAGGED, 9), self.visible[lost])
+            visible[lost_at] = 9 | EXPLODED
+            self.status[lost] = BatchMineField.LOST
+            changed.append((lost[:, None] * n_cells + np.arange(n_cells))[mines])
 
-            case _:  # Default case: Do nothing (invalid input)
-                pass
+        acted = boards[opening | flagging | chording]
+        won = acted[(self.hidden_safe[acted] == 0) & (self.correct_flags[acted] == self.n_mines)]
+        self.status[won[self.status[won] == BatchMineField.PLAYING]] = BatchMineField.WON
 
-        return [self.translate_coords(cell_idx)]
+        changed = np.concatenate(changed)
+        return CellChanges(idxs=changed, values=visible[changed])
@@ -0,0 +1,369 @@
+# minefields generated tile by tile where played, for boards far larger than memory, e.g. a 10^5 x 10^5 one:
+# ChunkedMineField(w=100_000, h=100_000, seed=0, path='board.tiles'), see benchmarks.py chunked_explore
+import os
+import secrets
+import struct
+from collections import Counter, OrderedDict, deque
+from itertools import product
+
+import numpy as np
+
+from engine import Grid, MineField, CellChanges, sum_neighbors, empty_regions, ACTIONS, OPEN, FLAG, MARK, \
+    HIDDEN, FLAGGED, MARKED, EXPLODED
+
+NEIGHBOR_OFFSETS = np.array([dydx for dydx in product((-1, 0, 1), repeat=2) if dydx != (0, 0)])
+
+
+class TileArrays:
+    """Visible cell codes of the explored tiles, one flat array of tile * tile cells each, in memory"""
+
+    def __init__(self, tile: int):
+        self.tile, self.tile_ids, self.slots = tile, [], []
+
+    def add(self, tile_id: int) -> int:
+        self.tile_ids.append(tile_id)
+        self.slots.append(np.full(self.tile * self.tile, HIDDEN, dtype=np.uint8))
+        return len(self.slots) - 1
+
+    def flush(self) -> None:
+        pass
+
+
+class TileFile(TileArrays):
+    """
+    Visible cell codes of the explored tiles in a memory-mapped file, a slot each in the order the tiles were first
+     touched, and their ids appended to an index file next to it (path + '.idx', after the field's settings), so that
+     only the pages played are in memory, and a game can be continued where it was left (see ChunkedMineField)
+    """
+    header = struct.Struct('<4sQQIqd')  # magic, w, h, tile, seed, density
+
+    def __init__(self, path: str, settings: tuple[int, int, int, int, float]):
+        super().__init__(tile=settings[2])
+        self.path = path
+        if os.path.exists(path + '.idx'):
+            with open(path + '.idx', 'rb') as f:
+                index = f.read()
+            magic, *stored = self.header.unpack_from(index)
+            assert magic == b'MFT1' and tuple(stored) == settings, f"{path} holds another field, {stored}"
+            self.tile_ids = np.frombuffer(index, np.int64, offset=self.header.size).tolist()
+        else:
+            with open(path + '.idx', 'wb') as f:
+                f.write(self.header.pack(b'MFT1', *settings))
+        self.index = open(path + '.idx', 'ab', buffering=0)  # unbuffered: a slot is never without its tile id
+        self._map(capacity=max(64, len(self.tile_ids)))
+
+    def _map(self, capacity: int) -> None:
+        self.slots = None  # unmapped before the file is resized (required on Windows)
+        with open(self.path, 'ab') as f:
+            f.truncate(max(f.tell(), capacity * self.tile * self.tile))
+        self.slots = np.memmap(self.path, dtype=np.uint8, mode='r+', shape=(capacity, self.tile * self.tile))
+
+    def add(self, tile_id: int) -> int:
+        slot = len(self.tile_ids)
+        if slot == len(self.slots):
+            self.slots.flush()
+            self._map(capacity=2 * slot)
+        self.slots[slot] = HIDDEN
+        self.index.write(np.int64(tile_id).tobytes())
+        self.tile_ids.append(tile_id)
+        return slot
+
+    def flush(self) -> None:
+        self.slots.flush()
+
+
+class ChunkedMineField(Grid):
+    """
+    Minefield of tile x tile chunks, each generated only when first played: a tile's mines are drawn from the seed and
+     its tile id alone (round(density * cells) of them), its digits from its mines and those along the borders of the
+     tiles around it. Played tiles keep their visible cell codes (see engine.GLYPHS), in memory or in a memory-mapped
+     file (path, see TileFile); digits and empty regions are regenerated as needed, keeping cache_tiles of them. So
+     memory grows with the explored area, not the board. Empty regions (see MineField.expand_empty_cells) are opened
+     across tiles. Moves and counters are as in MineField, except that losing only shows the mines of explored tiles.
+    Below ~10% of mines, empty regions percolate, i.e. a single cell may open an unbounded part of a huge board.
+    """
+    emoticons = MineField.emoticons
+    is_victory = MineField.is_victory  # same running counts
+
+    def __init__(self, w: int, h: int, density: float = 0.15, seed: int | None = None, tile: int = 256,
+                 path: str | None = None, cache_tiles: int = 64):
+        assert (w > 1 or h > 1), "Incorrect minefield dimensions (width and height)"
+        assert 0 < density < 1, "Incorrect minefield difficulty (density of mines)"
+        super().__init__(w=w, h=h)
+        self.density, self.tile, self.cache_tiles = density, tile, cache_tiles
+        self.seed = secrets.randbits(63) if seed is None else seed
+        self.tiles_y, self.tiles_x = -(-h // tile), -(-w // tile)
+        heights, widths = Counter(self._tile_sides(h)), Counter(self._tile_sides(w))
+        self.n_mines = sum(n_h * n_w * self._tile_mines(th, tw) for th, n_h in heights.items()
+                           for tw, n_w in widths.items())
+        self.store = TileArrays(tile) if path is None else TileFile(path, (w, h, tile, self.seed, density))
+        self.slot_of = {tile_id: slot for slot, tile_id in enumerate(self.store.tile_ids)}
+        self._mines_cache, self._solved_cache = OrderedDict(), OrderedDict()  # tile_id: mines; [digits, regions]
+
+        self.flags_left, self.hidden_safe = self.n_mines, w * h - self.n_mines
+        self.correct_flags = self.wrong_flags = 0
+        self.game_over, self.reaction = False, MineField.emoticons.GAME
+        for tile_id in self.slot_of:  # a continued game, count its explored tiles
+            self._count_stored(tile_id, self._visible(tile_id))
+
+    def _tile_sides(self, length: int) -> list[int]:
+        return [self.tile] * (length // self.tile) + ([length % self.tile] if length % self.tile else [])
+
+    def _tile_mines(self, th: int, tw: int) -> int:
+        return int(round(self.density * th * tw))
+
+    def tile_area(self, tile_id: int) -> tuple[int, int, int, int]:
+        """Top row, left column, height and width of a tile"""
+        ty, tx = divmod(tile_id, self.tiles_x)
+        y0, x0 = ty * self.tile, tx * self.tile
+        return y0, x0, min(self.tile, self.h - y0), min(self.tile, self.w - x0)
+
+    def locate(self, cell_idx: int) -> tuple[int, int]:
+        """Tile id of a cell and its flat index within the tile"""
+        y, x = divmod(cell_idx, self.w)
+        tile_id = y // self.tile * self.tiles_x + x // self.tile
+        y0, x0, _, tw = self.tile_area(tile_id)
+        return tile_id, (y - y0) * tw + x - x0
+
+    def _cached(self, cache: OrderedDict, tile_id: int, make) -> object:
+        if tile_id in cache:
+            cache.move_to_end(tile_id)
+            return cache[tile_id]
+        value = cache[tile_id] = make(tile_id)
+        if len(cache) > self.cache_tiles:
+            cache.popitem(last=False)
+        return value
+
+    def _mines(self, tile_id: int) -> np.ndarray:
+        """Mines of a tile (2D boolean mask), the same for the same seed, whichever tiles were generated before"""
+        def spread(tile_id: int) -> np.ndarray:
+            _, _, th, tw = self.tile_area(tile_id)
+            rng = np.random.default_rng([self.seed, tile_id])
+            mines = np.zeros(th * tw, dtype=bool)
+            mines[rng.choice(th * tw, size=self._tile_mines(th, tw), replace=False)] = True
+            return mines.reshape(th, tw)
+        return self._cached(self._mines_cache, tile_id, spread)
+
+    def _solved(self, tile_id: int) -> list:
+        """Digits (flat underneath of the tile, 9 for mines) and empty regions (None until needed) of a tile"""
+        def count(tile_id: int) -> list:
+            y0, x0, th, tw = self.tile_area(tile_id)
+            ty, tx = divmod(tile_id, self.tiles_x)
+            mines = np.zeros((th + 2, tw + 2), dtype=bool)  # with the ones bordering the tile
+            for ny, nx in product(range(max(ty - 1, 0), min(ty + 2, self.tiles_y)),
+                                  range(max(tx - 1, 0), min(tx + 2, self.tiles_x))):
+                ny0, nx0, nth, ntw = self.tile_area(ny * self.tiles_x + nx)
+                top, left = max(ny0, y0 - 1), max(nx0, x0 - 1)
+                bottom, right = min(ny0 + nth, y0 + th + 1), min(nx0 + ntw, x0 + tw + 1)
+                mines[top - y0 + 1:bottom - y0 + 1, left - x0 + 1:right - x0 + 1] = \
+                    self._mines(ny * self.tiles_x + nx)[top - ny0:bottom - ny0, left - nx0:right - nx0]
+            underneath = np.where(mines, np.uint8(9), sum_neighbors(mines))[1:-1, 1:-1]
+            return [underneath.ravel(), None]
+        return self._cached(self._solved_cache, tile_id, count)
+
+    def _underneath(self, tile_id: int) -> np.ndarray:
+        return self._solved(tile_id)[0]
+
+    def _regions(self, tile_id: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Empty regions within a tile, see engine.empty_regions"""
+        solved = self._solved(tile_id)
+        if solved[1] is None:
+            _, _, th, tw = self.tile_area(tile_id)
+            solved[1] = empty_regions(solved[0].reshape(th, tw))
+        return solved[1]
+
+    def _visible(self, tile_id: int) -> np.ndarray:
+        """Visible cell codes of a tile (flat, written through), all hidden when first touched"""
+        if (slot := self.slot_of.get(tile_id)) is None:
+            slot = self.slot_of[tile_id] = self.store.add(tile_id)
+        _, _, th, tw = self.tile_area(tile_id)
+        return self.store.slots[slot][:th * tw]
+
+    def _count_stored(self, tile_id: int, visible: np.ndarray) -> None:
+        flagged = (visible == HIDDEN | FLAGGED) | (visible == 9 | FLAGGED)
+        n_flagged = int(np.count_nonzero(flagged))
+        correct = int(np.count_nonzero(flagged & self._mines(tile_id).ravel()))
+        self.hidden_safe -= int(np.count_nonzero(visible < 9))
+        self.flags_left -= n_flagged
+        self.correct_flags, self.wrong_flags = self.correct_flags + correct, self.wrong_flags + n_flagged - correct
+        if np.any(visible == 9 | EXPLODED):
+            self.game_over, self.reaction = True, MineField.emoticons.LOST
+        else:
+            self.is_victory()
+
+    def underneath_at(self, cell_idx: int) -> int:
+        """Digit of a cell (9 for a mine), as MineField.underneath[cell_idx]"""
+        tile_id, local = self.locate(cell_idx)
+        return int(self._underneath(tile_id)[local])
+
+    def visible_window(self, top: int, left: int, rows: int, cols: int) -> np.ndarray:
+        """Visible cell codes of a rectangle of the board (rows x cols), e.g. for a view scrolled there"""
+        window = np.full((rows, cols), HIDDEN, dtype=np.uint8)
+        for ty, tx in product(range(top // self.tile, (top + rows - 1) // self.tile + 1),
+                              range(left // self.tile, (left + cols - 1) // self.tile + 1)):
+            if (tile_id := ty * self.tiles_x + tx) in self.slot_of:
+                y0, x0, th, tw = self.tile_area(tile_id)
+                y1, x1 = max(y0, top), max(x0, left)
+                y2, x2 = min(y0 + th, top + rows), min(x0 + tw, left + cols)
+                window[y1 - top:y2 - top, x1 - left:x2 - left] = \
+                    self._visible(tile_id).reshape(th, tw)[y1 - y0:y2 - y0, x1 - x0:x2 - x0]
+        return window
+
+    def _to_global(self, tile_id: int, local: np.ndarray) -> np.ndarray:
+        y0, x0, _, tw = self.tile_area(tile_id)
+        ly, lx = np.divmod(local.astype(np.int64), tw)
+        return (ly + y0) * self.w + lx + x0
+
+    def _count_flag(self, tile_id: int, local: int, placed: bool) -> None:
+        change = 1 if placed else -1
+        self.flags_left -= change
+        if self._underneath(tile_id)[local] == 9:
+            self.correct_flags += change
+        else:
+            self.wrong_flags += change
+
+    def explode(self, tile_id: int, local: int) -> tuple[np.ndarray, np.ndarray]:
+        """Ends the game lost at a mined cell and shows the mines of all explored tiles, returns the cells changed"""
+        self.game_over = True
+        self.reaction = MineField.emoticons.LOST
+        self._visible(tile_id)[local] = 9 | EXPLODED
+        changed = [self._to_global(tile_id, np.array([local]))]
+        for other_id in list(self.slot_of):
+            visible = self._visible(other_id)
+            others = np.flatnonzero(self._mines(other_id).ravel() & (visible != 9 | EXPLODED))
+            visible[others] = np.where(visible[others] == HIDDEN | FLAGGED, 9 | FLAGGED, 9)
+            changed.append(self._to_global(other_id, others))
+        return np.concatenate(changed)
+
+    def expand_empty_cells(self, tile_id: int, local: int) -> np.ndarray:
+        """
+        Opens the empty region of an empty cell, tile by tile: in each, the regions reached (see engine.empty_regions),
+         then their empty cells on the tile's edges reach across it, to regions of empty cells or to digits. Returns
+         the (global) indices of the cells opened.
+        """
+        opened, done = [], set()  # (tile, region) pairs opened in this fill
+        queue = deque([(tile_id, np.array([local]))])
+        while queue:
+            tile_id, seeds = queue.popleft()
+            y0, x0, th, tw = self.tile_area(tile_id)
+            underneath, visible = self._underneath(tile_id), self._visible(tile_id)
+            region_of, region_cells, region_start = self._regions(tile_id)
+            regions = [r for r in np.unique(region_of[seeds]).tolist() if (tile_id, r) not in done]
+            if not regions:
+                continue
+            done.update((tile_id, r) for r in regions)
+            cells = np.unique(np.concatenate([region_cells[region_start[r]:region_start[r + 1]] for r in regions]))
+            hidden = visible[cells] == HIDDEN  # flagged or marked (?) cells stay as they are
+            if not opened:
+                hidden |= cells == local  # except for the opened one itself
+            visible[cells[hidden]] = underneath[cells[hidden]]
+            opened.append(self._to_global(tile_id, cells[hidden]))
+
+            ly, lx = np.divmod(cells[underneath[cells] == 0], tw)
+            edge = (ly == 0) | (ly == th - 1) | (lx == 0) | (lx == tw - 1)
+            ny = ((ly[edge] + y0)[:, None] + NEIGHBOR_OFFSETS[:, 0]).ravel()
+            nx = ((lx[edge] + x0)[:, None] + NEIGHBOR_OFFSETS[:, 1]).ravel()
+            across = (0 <= ny) & (ny < self.h) & (0 <= nx) & (nx < self.w) & \
+                     ((ny < y0) | (ny >= y0 + th) | (nx < x0) | (nx >= x0 + tw))
+            reached = np.unique(ny[across] * self.w + nx[across])
+            ny, nx = np.divmod(reached, self.w)
+            next_tiles = ny // self.tile * self.tiles_x + nx // self.tile
+            for next_id in np.unique(next_tiles).tolist():
+                ny0, nx0, _, ntw = self.tile_area(next_id)
+                at = next_tiles == next_id
+                next_local = (ny[at] - ny0) * ntw + nx[at] - nx0
+                next_underneath, next_visible = self._underneath(next_id), self._visible(next_id)
+                digits = next_local[(next_underneath[next_local] > 0) & (next_visible[next_local] == HIDDEN)]
+                next_visible[digits] = next_underneath[digits]  # never mines, being next to an empty cell
+                opened.append(self._to_global(next_id, digits))
+                if (empty := next_local[next_underneath[next_local] == 0]).size:
+                    queue.append((next_id, empty))
+        return np.concatenate(opened)
+
+    def chord(self, cell_idx: int) -> np.ndarray:
+        """Opens the hidden neighbors of an opened digit with as many flags around it, as MineField.chord"""
+        y, x = divmod(cell_idx, self.w)
+        ny, nx = y + NEIGHBOR_OFFSETS[:, 0], x + NEIGHBOR_OFFSETS[:, 1]
+        inside = (0 <= ny) & (ny < self.h) & (0 <= nx) & (nx < self.w)
+        around = np.sort(ny[inside] * self.w + nx[inside])
+        seen = self.visible_at(around)
+        targets = around[seen == HIDDEN]
+        if np.count_nonzero(seen == HIDDEN | FLAGGED) != self.visible_at([cell_idx])[0] or not targets.size:
+            return np.array([cell_idx], dtype=np.int64)
+        digits = np.array([self.underneath_at(idx) for idx in targets.tolist()])
+        if (mined := targets[digits == 9]).size:
+            return self.explode(*self.locate(int(mined[0])))
+        opened = []
+        for idx, digit in zip(targets.tolist(), digits.tolist()):
+            tile_id, local = self.locate(idx)
+            visible = self._visible(tile_id)
+            if visible[local] != HIDDEN:  # opened by the empty region of another target
+                continue
+            if digit:
+                visible[local] = digit
+                opened.append(np.array([idx], dtype=np.int64))
+            else:
+                opened.append(self.expand_empty_cells(tile_id, local))
+        opened = np.sort(np.concatenate(opened))
+        self.hidden_safe -= opened.size
+        self.is_victory()
+        return opened
+
+    def cell_action(self, cell_idx: int, user_input: str) -> CellChanges:
+        """Plays user's input (see engine.ACTIONS) in a cell, as MineField.cell_action"""
+        tile_id, local = self.locate(cell_idx)
+        visible = self._visible(tile_id)
+        changed = np.array([cell_idx], dtype=np.int64)
+        sees, action = int(visible[local]), ACTIONS.get(user_input)
+        if self.game_over:
+            pass
+
+        elif action == OPEN and 0 < sees < 9:
+            changed = self.chord(cell_idx)
+
+        elif not sees & HIDDEN or action is None:  # opened cell (0-8) or invalid input: do nothing
+            pass
+
+        elif action == OPEN:
+            if sees == HIDDEN | FLAGGED:
+                self._count_flag(tile_id, local, placed=False)
+            match self._underneath(tile_id)[local]:
+                case 9:
+                    changed = self.explode(tile_id, local)
+                case shown_digit if shown_digit != 0:
+                    visible[local] = shown_digit
+                    self.hidden_safe -= 1
+                    self.is_victory()
+                case 0:
+                    changed = self.expand_empty_cells(tile_id, local)
+                    self.hidden_safe -= changed.size
+                    self.is_victory()
+
+        elif action == FLAG:
+            if sees != HIDDEN | FLAGGED:
+                visible[local] = HIDDEN | FLAGGED
+                self._count_flag(tile_id, local, placed=True)
+                self.is_victory()
+
+        else:  # mark with '?' or clear, also replacing a flag
+            if sees == HIDDEN | FLAGGED:
+                self._count_flag(tile_id, local, placed=False)
+            visible[local] = HIDDEN | MARKED if action == MARK else HIDDEN
+
+        return CellChanges(idxs=changed, values=self.visible_at(changed))
+
+    def visible_at(self, cell_idxs: np.ndarray) -> np.ndarray:
+        """Visible cell codes of the given cells (global indices)"""
+        values = np.full(len(cell_idxs), HIDDEN, dtype=np.uint8)
+        ys, xs = np.divmod(np.asarray(cell_idxs, dtype=np.int64), self.w)
+        tiles = ys // self.tile * self.tiles_x + xs // self.tile
+        for tile_id in np.unique(tiles).tolist():
+            if tile_id in self.slot_of:
+                y0, x0, _, tw = self.tile_area(tile_id)
+                at = tiles == tile_id
+                values[at] = self._visible(tile_id)[(ys[at] - y0) * tw + xs[at] - x0]
+        return values
+
+    def flush(self) -> None:
+        """Writes the explored tiles to their file, if any"""
+        self.store.flush()
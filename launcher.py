@@ -1,17 +1,45 @@
-# you may need to provide your own path (may depend on your Excel installation) in ui_excel.py
+# plays a game with the engine, view and bot chosen by name (see registry.py), importing only those, e.g.
+# `python launcher.py --view cli --bot demo --difficulty 2`; without --bot the user plays in Excel (you may need to
+# provide your own path, depending on your Excel installation, in ui_excel.py)
+import argparse
+
+from metrics import Metrics
 from mvc import MVC_Mines_Controller
-from ui_ro_cli import CLIViewReadOnly
-from ui_excel import ExcelViewController
-from bot_strategy import demo_bot
+from registry import REGISTRY, load
 
 
 def start_Excel_demo(excel: bool = True) -> None:
-    launched_instance = MVC_Mines_Controller.from_CLI_settings(ui=ExcelViewController if excel else CLIViewReadOnly)
-    launched_instance.start_game(bot_strategy=demo_bot)
+    launched_instance = MVC_Mines_Controller.from_CLI_settings(ui=load('view', 'excel' if excel else 'cli'))
+    launched_instance.start_game(bot_strategy=load('bot', 'demo'))
 
 
-if __name__ == "__main__":
-    # start_Excel_demo()  # for a bot to play
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Play Minesweeper, or watch a bot play it")
+    parser.add_argument('--engine', default='minefield', help=f"one of {', '.join(REGISTRY['engine'])} or module:class")
+    parser.add_argument('--view', default='excel', help=f"one of {', '.join(REGISTRY['view'])} or module:class")
+    parser.add_argument('--bot', help=f"one of {', '.join(REGISTRY['bot'])} or module:function (default: the user)")
+    size = parser.add_mutually_exclusive_group()  # neither: asked for, see MVC_Mines_Controller.from_CLI_settings
+    size.add_argument('--difficulty', type=int, choices=MVC_Mines_Controller.presets)
+    size.add_argument('--size', type=int, nargs=3, metavar=('ROWS', 'COLS', 'MINES'))
+    parser.add_argument('--seed', type=int, help="seed of the minefield (default: random)")
+    parser.add_argument('--metrics',
+                        help="JSON or CSV file (by extension) to write per-move metrics to, see metrics.py")
+    args = parser.parse_args(argv)
+    if args.bot is None and args.view in ('cli', 'headless'):
+        parser.error(f"The {args.view} view takes no moves from the user, choose a --bot")
+
+    engine, ui = load('engine', args.engine), load('view', args.view)
+    bot_strategy = None if args.bot is None else load('bot', args.bot)
+    settings = {'seed': args.seed, 'metrics': Metrics() if args.metrics else None}
+    if args.difficulty is None and args.size is None:
+        controller = MVC_Mines_Controller.from_CLI_settings(ui=ui, engine=engine, **settings)
+    else:
+        rows, cols, mines = MVC_Mines_Controller.presets[args.difficulty] if args.size is None else args.size
+        controller = MVC_Mines_Controller(cols=cols, rows=rows, mines=mines, engine=engine, ui=ui, **settings)
+    controller.start_game(bot_strategy=bot_strategy)
+    if args.metrics:
+        (controller.metrics.to_csv if args.metrics.endswith('.csv') else controller.metrics.to_json)(args.metrics)
 
-    default_launched_instance = MVC_Mines_Controller.from_CLI_settings(ui=ExcelViewController)
-    default_launched_instance.start_game()  # for a user to play
+
+if __name__ == "__main__":
+    main()
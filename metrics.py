@@ -0,0 +1,127 @@
+# per-move instrumentation, e.g. MVC_Mines_Controller(..., metrics=Metrics()), then controller.metrics.to_json(path)
+import csv
+import json
+import time
+from collections import Counter
+from typing import Callable
+
+import numpy as np
+
+from engine import CellChanges
+
+
+class Histogram:
+    """Counts of values (e.g. ns) in logarithmic buckets, 4 per power of 2 (within 25%), so its size stays small
+     however many values are added"""
+
+    def __init__(self):
+        self.buckets = {}  # lower bound of a bucket: values in it
+        self.n = self.total = self.max = 0
+
+    def add(self, value: int) -> None:
+        self.n += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        drop = value.bit_length() - 3  # keep the 3 leading bits
+        bucket = value >> drop << drop if drop > 0 else value
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def merge(self, other: 'Histogram') -> None:
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        self.n, self.total, self.max = self.n + other.n, self.total + other.total, max(self.max, other.max)
+
+    def percentile(self, q: float) -> int:
+        """Lower bound of the bucket holding the q-th percentile"""
+        lows = sorted(self.buckets)
+        counts = np.cumsum([self.buckets[low] for low in lows])
+        return lows[int(np.searchsorted(counts, q / 100 * self.n))] if self.n else 0
+
+    def summary(self) -> dict:
+        return {'n': self.n, 'total': self.total, 'mean': round(self.total / self.n, 1) if self.n else 0,
+                'p50': self.percentile(50), 'p90': self.percentile(90), 'p99': self.percentile(99), 'max': self.max}
+
+
+class Metrics:
+    """
+    Counters and histograms of a game's (or many games') move phases: decide (bot or user's input), observe (a
+     stateful bot's update), apply (engine), render (view's refresh_grid) and flush, in ns, plus the cells each move
+     changed and revealed (opened, one or a flood fill), and the calls views made to their output (view_writes).
+     Installed by wrapping those methods of the controller's model and view (see instrument), so nothing is added to
+     a game played without metrics. Hooks are called with (phase, ns, result) after each timed call, e.g. to log slow
+     moves.
+    """
+
+    def __init__(self):
+        self.counters = Counter()
+        self.histograms = {}  # name: Histogram
+        self.hooks = []
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] += n
+
+    def histogram(self, name: str) -> Histogram:
+        if name not in self.histograms:
+            self.histograms[name] = Histogram()
+        return self.histograms[name]
+
+    def observe(self, name: str, value: int) -> None:
+        self.histogram(name).add(value)
+
+    def timed(self, phase: str, func: Callable) -> Callable:
+        """func, each call timed into the phase's histogram (phase + '_ns')"""
+        add, hooks, clock = self.histogram(phase + '_ns').add, self.hooks, time.perf_counter_ns
+
+        def timed_call(*args, **kwargs):
+            start = clock()
+            result = func(*args, **kwargs)
+            ns = clock() - start
+            add(ns)
+            for hook in hooks:
+                hook(phase, ns, result)
+            return result
+        return timed_call
+
+    def instrument(self, model: object, view: object) -> None:
+        """Times a controller's engine moves and rendering, and counts what they change"""
+        cell_action, counters = self.timed('apply', model.cell_action), self.counters
+        add_revealed = self.histogram('revealed_per_move').add
+
+        def counted_cell_action(*args, **kwargs) -> CellChanges:
+            hidden_safe = model.hidden_safe
+            changes = cell_action(*args, **kwargs)
+            counters['moves'] += 1
+            counters['cells_changed'] += changes.idxs.size
+            if revealed := hidden_safe - model.hidden_safe:  # any cells opened, one or a whole flood fill
+                counters['cells_revealed'] += revealed
+                add_revealed(revealed)
+            return changes
+
+        model.cell_action = counted_cell_action
+        view.refresh_grid = self.timed('render', view.refresh_grid)
+        view.flush = self.timed('flush', view.flush)
+        view.metrics = self  # for views to count their writes
+
+    def merge(self, other: 'Metrics') -> None:
+        self.counters.update(other.counters)
+        for name, histogram in other.histograms.items():
+            self.histograms.setdefault(name, Histogram()).merge(histogram)
+
+    def to_dict(self) -> dict:
+        return {'counters': dict(self.counters),
+                'histograms': {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}}
+
+    def to_json(self, path: str) -> None:
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def to_csv(self, path: str) -> None:
+        """A row per counter (its value in total) and per histogram"""
+        columns = ['name', 'n', 'total', 'mean', 'p50', 'p90', 'p99', 'max']
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows({'name': name, 'total': value} for name, value in sorted(self.counters.items()))
+            writer.writerows({'name': name, **histogram.summary()}
+                             for name, histogram in sorted(self.histograms.items()))
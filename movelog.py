@@ -0,0 +1,81 @@
+# compact binary logs of seeded games, written by MVC_Mines_Controller(..., move_log=f) and replayed by replay.py
+import os
+import struct
+import zlib
+from typing import BinaryIO, Iterator, NamedTuple
+
+import numpy as np
+
+from engine import MineField, ACTIONS
+
+# a game: header, a little-endian uint32 per move (cell index << 2 | action code, see engine.ACTIONS), then, once the
+# game is over, END and the final state. Everything is a multiple of 4 bytes, so a log reads as an array of uint32
+HEADER = struct.Struct('<4sIIIq')  # magic, w, h, mines, seed
+FOOTER = struct.Struct('<IiQI')  # status (PLAYING, WON, LOST as in BatchMineField), flags left, hidden safe, crc32
+END = 0xFFFFFFFF  # never a move, cell indices stay below 2**30 - 1
+INPUTS = ['j', 'f', '?', ' ']  # action code to user input, as ACTIONS maps them
+
+
+class FinalState(NamedTuple):
+    status: int
+    flags_left: int
+    hidden_safe: int
+    crc: int  # of the visible cell codes
+
+
+class GameLog(NamedTuple):
+    w: int
+    h: int
+    mines: int
+    seed: int
+    moves: np.ndarray  # uint32 records
+    final: FinalState | None  # None for a game not over (e.g. interrupted)
+
+
+def final_state(field: MineField) -> FinalState:
+    status = {MineField.emoticons.WON: 1, MineField.emoticons.LOST: 2}.get(field.reaction, 0)
+    return FinalState(status, field.flags_left, field.hidden_safe, zlib.crc32(field.visible))
+
+
+class MoveLogWriter:
+    """Appends a seeded game to a binary file, move by move"""
+
+    def __init__(self, f: BinaryIO, w: int, h: int, mines: int, seed: int):
+        assert w * h < 2**30 - 1, "Board too large for the move log"
+        self.f, self.finished = f, False
+        f.write(HEADER.pack(b'MLG1', w, h, mines, seed))
+
+    def record(self, cell_idx: int, user_input: str) -> None:
+        if (action := ACTIONS.get(user_input)) is not None:  # other inputs change nothing
+            self.f.write((int(cell_idx) << 2 | action).to_bytes(4, 'little'))  # also a bot's numpy index
+
+    def finish(self, field: MineField) -> None:
+        """Ends the game's log with its final state, also of a game not over (e.g. abandoned), before the next game"""
+        if not self.finished:
+            self.f.write(END.to_bytes(4, 'little') + FOOTER.pack(*final_state(field)))
+            self.finished = True
+
+
+def read_games(path: str, window: int = 4096) -> Iterator[GameLog]:
+    """Games of a log file one by one, memory-mapped, so that files larger than memory are streamed"""
+    words = np.memmap(path, dtype='<u4', mode='r') if os.path.getsize(path) else np.empty(0, '<u4')
+    header_words, footer_words = HEADER.size // 4, FOOTER.size // 4
+    at = 0
+    while at < words.size:
+        magic, w, h, mines, seed = HEADER.unpack(words[at:at + header_words].tobytes())
+        assert magic == b'MLG1', f"Not a move log at byte {4 * at} of {path}"
+        start = end = at + header_words
+        step = window
+        while end < words.size:  # the next END, searched in growing windows
+            found = np.flatnonzero(words[end:end + step] == END)
+            if found.size:
+                end += int(found[0])
+                break
+            end, step = min(end + step, words.size), 2 * step
+        final = None
+        if end < words.size:
+            final = FinalState(*FOOTER.unpack(words[end + 1:end + 1 + footer_words].tobytes()))
+            at = end + 1 + footer_words
+        else:
+            at = end
+        yield GameLog(w, h, mines, seed, np.array(words[start:end]), final)
@@ -1,31 +1,45 @@
+import secrets
 import time
-from engine import MineField, Grid
-from typing import Callable
+from engine import MineField, Grid, CellChanges
+from metrics import Metrics
+from movelog import MoveLogWriter
+from typing import BinaryIO, Callable
 
 
 class MVC_Mines_Controller:
+    presets = {  # difficulty: rows, cols, mines
+        1: (9, 9, 10),  # Beginner
+        2: (16, 16, 40),  # Normal
+        3: (16, 30, 99),  # Expert
+    }
 
-    def __init__(self, cols: int, rows: int, mines: int, engine: 'MineSweeperModel', ui: 'MineSweeperView'):
-        self.model = engine(w=cols, h=rows)
+    def __init__(self, cols: int, rows: int, mines: int, engine: 'MineSweeperModel', ui: 'MineSweeperView',
+                 seed: int | None = None, move_log: BinaryIO | None = None, metrics: Metrics | None = None):
+        if move_log is not None and seed is None:
+            seed = secrets.randbits(63)  # a logged game is replayed from its seed
+        self.model = engine(w=cols, h=rows, seed=seed)
         self.players_view = self.model.complete_field_init(int(mines))
+        self.move_log = None if move_log is None else MoveLogWriter(move_log, cols, rows, int(mines), seed)
         self.view = ui(cols, rows, content_view=self.players_view)
         self.flags_left = self.view.flag_counter = self.model.flags_left
         self.displayed_grid = self.view.format_grid()
+        self.observe_changes = None  # a stateful bot's update with each move's changes, see _feed
+        self.metrics = metrics  # e.g. exported with metrics.to_json at game end
+        if metrics is not None:  # else the game runs uninstrumented
+            metrics.instrument(self.model, self.view)
         # print(model.underneath.reshape((rows, cols)))  # debug
 
     @classmethod
-    def from_CLI_settings(cls, ui: 'MineSweeperView', engine: 'MineSweeperModel' = MineField) -> 'MVC_Mines_Controller':
+    def from_CLI_settings(cls, ui: 'MineSweeperView', engine: 'MineSweeperModel' = MineField,
+                          **kwargs) -> 'MVC_Mines_Controller':
+        """Asks for the difficulty (or size) in the terminal, other settings (e.g. seed) are passed on"""
         print("Excel controls. After setting difficulty here:")
         print("1) Select a cell on the grid using the arrow keys.")
         print("2) Enter a symbol: j to click/open selected cell, f to (f)lag mine, or ? to mark for yourself.\n\n")
         difficulty = 0
         while not difficulty:
             difficulty = input("Select difficulty (1 - Beginner, 2 - Normal, 3 - Expert, 0 - Custom: ")
-        rows, cols, mines = {
-            1: (9, 9, 10),
-            2: (16, 16, 40),
-            3: (16, 30, 99),
-        }.setdefault(int(difficulty), (0, 0, 0))
+        rows, cols, mines = cls.presets.get(int(difficulty), (0, 0, 0))
 
         while not rows:
             rows = input("Enter the number of rows: ")
@@ -36,49 +50,87 @@ class MVC_Mines_Controller:
         while not mines:
             mines = input("Enter the number of mines: ")  # to-do move game creation into Excel (take all from cells)
 
-        return cls(cols=cols, rows=rows, mines=mines, engine=engine, ui=ui)
+        return cls(cols=cols, rows=rows, mines=mines, engine=engine, ui=ui, **kwargs)
 
     def start_game(self, bot_strategy: Callable | None = None):
         model, view = self.model, self.view  # shorten names
-        get_move = self.get_user_move if bot_strategy is None else self._feed(bot_strategy)
+        get_move = self._move_source(bot_strategy)
         starting_time = time.time()
 
         while not model.game_over:  # make a generator loop?
             move = get_move()
-            if move:
-                changed_cell_idx, changed_cell_val = move
-                affected_cells = model.cell_action(cell_idx=changed_cell_idx, user_input=changed_cell_val)
-                if affected_cells:  # universal engine, in other games may be used, in minesweeper always True
-                    view.flag_counter, view.smile = model.flags_left, model.reaction.value
-                    self.displayed_grid = view.refresh_grid(affected_cells)  # record updated grid state
+            if isinstance(move, list):  # a bot's batch of moves
+                self.apply_moves(move)
+            elif move:
+                self.apply_move(*move)
             view.clock = time.time() - starting_time  # display time passed for the player
+        view.flush()
         return
 
+    def apply_move(self, cell_idx: int, user_input: str) -> CellChanges:
+        """Plays a move in the engine and renders the cells it changed"""
+        model, view = self.model, self.view
+        changes = model.cell_action(cell_idx=cell_idx, user_input=user_input)
+        self._log_move(cell_idx, user_input)
+        if changes.idxs.size:  # universal engine, in other games may be used, in minesweeper always True
+            view.flag_counter, view.smile = model.flags_left, model.reaction.value
+            self.displayed_grid = view.refresh_grid(changes)  # record updated grid state
+            if self.observe_changes is not None:
+                self.observe_changes(changes)
+        return changes
+
+    def apply_moves(self, moves: list[tuple[int, str]]) -> CellChanges:
+        """Plays many moves in the engine at once (until the game is over) and renders all the cells they changed
+         once"""
+        model, view = self.model, self.view
+        changes = model.cell_actions(moves, played=None if self.move_log is None else self._log_move)
+        if changes.idxs.size:
+            view.flag_counter, view.smile = model.flags_left, model.reaction.value
+            self.displayed_grid = view.refresh_grid(changes)
+            if self.observe_changes is not None:
+                self.observe_changes(changes)
+        return changes
+
+    def _log_move(self, cell_idx: int, user_input: str) -> None:
+        """Records a move played, and the final state after the last one, see movelog.py"""
+        if self.move_log is not None:
+            self.move_log.record(cell_idx, user_input)
+            if self.model.game_over:
+                self.move_log.finish(self.model)
+
     def get_user_move(self) -> tuple[int, str] | None:
-        """Checks for and returns a valid user input (i.e. change in a cell on the grid/minefield range)"""
-        time.sleep(1)  # poll user (not bot) "move" every second
-        chgs, prior_values = 0, self.displayed_grid  # contains state (cell values/contents) prior to user input
-        new_values = self.view.read_grid()
-        for i, (old_val, new_val) in enumerate(zip(prior_values, new_values)):
-            if old_val != new_val:
-                chgs += 1
-                changed_cell_idx, changed_cell_val = i, str(new_val)
-        if chgs == 1:
-            return changed_cell_idx, changed_cell_val
-        elif chgs > 1:
-            self._invalid_move_rollback(grid_prev_state=prior_values)
-        return None  # chgs == 0 or > 1
-
-    def _invalid_move_rollback(self, grid_prev_state: "Value2") -> None:
+        """Waits (up to a second, for the clock to keep ticking) for the user's input in the grid, see
+         ui_excel.GridInput, and returns it if valid, i.e. a change in a single cell on the grid/minefield range"""
+        changes = self.view.user_input.next_changes(timeout=1)
+        if changes is not None and len(changes) == 1:
+            return changes[0]
+        elif changes:
+            self._invalid_move_rollback(grid_prev_state=self.displayed_grid)
+        return None  # no change or > 1
+
+    def _invalid_move_rollback(self, grid_prev_state: "np.ndarray") -> None:
         print("User tried to change multiple cells")
         self.view.smile = self.model.emoticons.WAITS.value  # place in parent class of ExcelViewController (to-do)?
         self.view.set_grid(grid_prev_state)  # reset cell values to before last user's move
 
+    def _move_source(self, bot_strategy: Callable | None) -> Callable:
+        """The bot's moves if given, else the user's, timed as the decide phase with metrics (and the bot's observe)"""
+        get_move = self.get_user_move if bot_strategy is None else self._feed(bot_strategy)
+        if self.metrics is None:
+            return get_move
+        if self.observe_changes is not None:  # the bot's update after each move, see _feed
+            self.observe_changes = self.metrics.timed('observe', self.observe_changes)
+        return self.metrics.timed('decide', get_move)
+
     def _feed(self, bot_strategy: Callable) -> Callable:
         """ Supplement bot with what user sees (programmatically). Alternatively, use functools.partial.
          Minesweeper is Markovian (probabilities can be computed from current state and do not depend on priors),
-         therefore no need to maintain state and use coroutine; thus, a simple call of external function."""
+         therefore no need to maintain state and use coroutine; thus, a simple call of external function.
+         Bots that keep state anyway (to avoid recomputing it every move) get the changes of each move via observe.
+         A bot may return a list of moves, played together and rendered once (see apply_moves)."""
+        self.observe_changes = getattr(bot_strategy, 'observe', None)
         grid_methods = Grid(w=self.model.w, h=self.model.h)  # only to provide access to (fixed) coordinate plane
-        def move_by_bot() -> tuple[int, str]:
-            return bot_strategy(visible_grid=self.players_view, mines_left=self.flags_left, grid_methods=grid_methods)
+        def move_by_bot() -> tuple[int, str] | list[tuple[int, str]]:
+            return bot_strategy(visible_grid=self.players_view, mines_left=self.model.flags_left,
+                                grid_methods=grid_methods)
         return move_by_bot
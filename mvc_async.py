@@ -0,0 +1,104 @@
+# asyncio variant of MVC_Mines_Controller, e.g. `asyncio.run(play_many(controllers, bot_factory=FrontierSolver))`
+import asyncio
+import time
+from concurrent.futures import Executor
+from typing import Callable
+
+import numpy as np
+
+from engine import CellChanges
+from mvc import MVC_Mines_Controller
+
+
+class AsyncMinesController(MVC_Mines_Controller):
+    """
+    Plays a game as independent asyncio tasks instead of one loop: intake of moves (the bot's or the user's input, in an
+     executor, so that neither blocks the event loop), their application to the engine, a clock ticking at a fixed
+     rate, and rendering, which coalesces all changes made since its previous flush (at most render_hz flushes a
+     second). A slow render thus does not delay moves, nor a thinking bot the clock; many games can share one process.
+    """
+
+    def __init__(self, *args, clock_hz: float = 1, render_hz: float = 30, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.clock_hz, self.render_hz = clock_hz, render_hz
+        self.pending = []  # cell indices changed by moves applied but not yet rendered
+        self.tick_delays = []  # seconds each clock tick came late, e.g. for a blocked event loop
+
+    async def play(self, bot_strategy: Callable | None = None, executor: Executor | None = None) -> bool:
+        """Plays the game until it is over, with the given bot (else the user), returns whether it was won"""
+        get_move = self._move_source(bot_strategy)
+        moves, changed, rendered = asyncio.Queue(maxsize=1), asyncio.Event(), asyncio.Event()
+        rendered.set()
+        start = time.perf_counter()
+        user_waits_for = None if bot_strategy else rendered  # user's input is read from the view, showing the move
+        intake = asyncio.create_task(self._intake(get_move, moves, executor, wait_for=user_waits_for))
+        clock = asyncio.create_task(self._tick(start))
+        render = asyncio.create_task(self._render(changed, rendered))
+        await self._apply(moves, changed, rendered)
+        intake.cancel()
+        clock.cancel()
+        await render
+        self.view.clock = time.perf_counter() - start
+        self.view.flush()
+        return self.model.reaction == self.model.emoticons.WON
+
+    async def _intake(self, get_move: Callable, moves: asyncio.Queue, executor: Executor | None,
+                      wait_for: asyncio.Event | None) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            if move := await loop.run_in_executor(executor, get_move):
+                await moves.put(move)
+                await moves.join()  # the next move is decided on the grid this one leads to
+                if wait_for is not None:
+                    await wait_for.wait()
+
+    async def _apply(self, moves: asyncio.Queue, changed: asyncio.Event, rendered: asyncio.Event) -> None:
+        while not self.model.game_over:
+            move = await moves.get()
+            if isinstance(move, list):  # a bot's batch of moves, see MVC_Mines_Controller.apply_moves
+                changes = self.model.cell_actions(move, played=self._log_move)
+            else:
+                changes = self.model.cell_action(*move)
+                self._log_move(*move)
+            if changes.idxs.size:
+                self.pending.append(changes.idxs)
+                rendered.clear()
+                changed.set()
+                if self.observe_changes is not None:
+                    self.observe_changes(changes)
+            moves.task_done()
+        changed.set()  # for the last render
+
+    async def _tick(self, start: float) -> None:
+        period, next_tick = 1 / self.clock_hz, start
+        while True:
+            next_tick += period  # fixed rate: late ticks do not delay the next ones
+            await asyncio.sleep(max(0.0, next_tick - time.perf_counter()))
+            self.tick_delays.append(time.perf_counter() - next_tick)
+            self.view.clock = time.perf_counter() - start
+
+    async def _render(self, changed: asyncio.Event, rendered: asyncio.Event) -> None:
+        while not self.model.game_over or self.pending:
+            await changed.wait()
+            changed.clear()
+            if self.pending:
+                self._render_pending()
+            if not self.view.frame_pending:
+                rendered.set()
+            await asyncio.sleep(1 / self.render_hz)  # moves applied meanwhile are rendered together
+            if self.view.frame_pending:  # the view held the frame back (e.g. at its own frame rate), draw it now
+                self.view.flush()
+                rendered.set()
+
+    def _render_pending(self) -> None:
+        idxs = np.unique(np.concatenate(self.pending))
+        self.pending.clear()
+        model, view = self.model, self.view
+        view.flag_counter, view.smile = model.flags_left, model.reaction.value
+        self.displayed_grid = view.refresh_grid(CellChanges(idxs, model.visible[idxs]))
+
+
+async def play_many(controllers: list[AsyncMinesController], bot_factory: Callable,
+                    executor: Executor | None = None) -> list[bool]:
+    """Plays all games concurrently, each with its own bot (bot_factory(), e.g. a stateful FrontierSolver)"""
+    return await asyncio.gather(*(controller.play(bot_factory(), executor) for controller in controllers))
@@ -0,0 +1,115 @@
+# lookup table of what pairs of nearby digits force, built offline by `python patterns.py` (else on first use), for
+# demo_bot to find certain moves without set arithmetic, see forced_move
+import os
+import time
+from functools import lru_cache
+from random import choice
+
+import numpy as np
+
+TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pair_patterns.npy')
+SIDE = 9  # each of the 5 counts of a pattern is 0-8
+# forced cells of a pattern, bits of its table entry: digit a's own hidden cells, digit b's, the ones they share
+A_SAFE, A_MINES, B_SAFE, B_MINES, SHARED_SAFE, SHARED_MINES = (1 << bit for bit in range(6))
+# offsets (dy, dx) of the digits b after a digit a whose neighbors may overlap, each pair once
+OFFSETS = [(dy, dx) for dy in range(3) for dx in range(-2, 3) if dy > 0 or dx > 0]
+WEIGHTS = SIDE ** np.arange(4, -1, -1)  # of the counts in a pattern's key, see pattern_keys
+
+
+def build_table() -> np.ndarray:
+    """
+    Exhaustive enumeration of the local patterns of two digits: mines still to flag around each (a, b), and their
+     hidden neighbors only a has (p), only b has (q) and both share (s). For every number k of mines in the shared
+     cells that both digits allow, a's own cells hold a - k and b's b - k; cells with no mine (or all mines) for every
+     such k are forced. Returns the forced bits per pattern, indexed by pattern_keys.
+    """
+    a, b, p, q, s = np.indices((SIDE,) * 5).reshape(5, -1)
+    feasible_any = np.zeros(a.size, dtype=bool)
+    a_some, a_not_all, b_some, b_not_all, s_some, s_not_all = (np.zeros(a.size, dtype=bool) for _ in range(6))
+    for k in range(SIDE):
+        feasible = (k <= s) & (k <= a) & (a - k <= p) & (k <= b) & (b - k <= q)
+        feasible_any |= feasible
+        a_some |= feasible & (a - k > 0)
+        a_not_all |= feasible & (a - k < p)
+        b_some |= feasible & (b - k > 0)
+        b_not_all |= feasible & (b - k < q)
+        s_some |= feasible & (k > 0)
+        s_not_all |= feasible & (k < s)
+    table = np.zeros(a.size, dtype=np.uint8)
+    for bit, forced, cells in ((A_SAFE, ~a_some, p), (A_MINES, ~a_not_all, p), (B_SAFE, ~b_some, q),
+                               (B_MINES, ~b_not_all, q), (SHARED_SAFE, ~s_some, s), (SHARED_MINES, ~s_not_all, s)):
+        table[feasible_any & forced & (cells > 0)] |= bit
+    return table
+
+
+@lru_cache(maxsize=1)
+def load_table(path: str = TABLE_FILE) -> np.ndarray:
+    """The table from its file, built and saved there first if missing (kept in memory if it cannot be saved)"""
+    if os.path.exists(path):
+        return np.load(path)
+    table = build_table()
+    try:  # atomically, as other processes (e.g. tournament.py workers) may load it meanwhile
+        with open(temporary := f"{path}.{os.getpid()}", 'wb') as f:
+            np.save(f, table)
+        os.replace(temporary, path)
+    except OSError:
+        pass
+    return table
+
+
+def pattern_keys(a: np.ndarray, b: np.ndarray, p: np.ndarray, q: np.ndarray, s: np.ndarray) -> np.ndarray:
+    return np.stack([a, b, p, q, s], axis=-1) @ WEIGHTS
+
+
+@lru_cache(maxsize=8)  # as engine.neighbor_table
+def partner_table(w: int, h: int) -> np.ndarray:
+    """Flat indices of the cells at OFFSETS from every cell (one row per cell index), padded with w * h"""
+    ys, xs = np.divmod(np.arange(w * h), w)
+    table = np.full((w * h, len(OFFSETS)), w * h)
+    for k, (dy, dx) in enumerate(OFFSETS):
+        inside = (0 <= xs + dx) & (xs + dx < w) & (ys + dy < h)
+        table[inside, k] = (ys[inside] + dy) * w + xs[inside] + dx
+    table.flags.writeable = False
+    return table
+
+
+def forced_move(digit_idxs: np.ndarray, nearby: np.ndarray, empty_nearby: np.ndarray, needs: np.ndarray,
+                w: int, h: int) -> tuple[int, str] | None:
+    """
+    A certain move from the first pair of frontier digits (in grid order) whose pattern forces cells, opening a safe
+     cell before flagging a mine, None if no pair does. Arrays as in demo_bot, of the frontier digits only (with
+     hidden neighbors): their cell indices (ascending), neighbor indices, which of those are hidden, and mines left
+     around them (0-8). Patterns are encoded for all pairs at once and looked up in the table.
+    """
+    position = np.full(w * h + 1, -1)  # cell index: its number among the frontier digits (the last one: off-grid)
+    position[digit_idxs] = np.arange(digit_idxs.size)
+    partner = position[partner_table(w, h)[digit_idxs]]
+    first, second = np.nonzero(partner >= 0)  # in grid order of the first digit
+    if not first.size:
+        return None
+    second = partner[first, second]
+    hidden_a, hidden_b = empty_nearby[first], empty_nearby[second]
+    shared = ((nearby[first][:, :, None] == nearby[second][:, None, :]) & hidden_a[:, :, None]).sum(axis=(1, 2))
+    forced = load_table()[pattern_keys(needs[first], needs[second], hidden_a.sum(axis=1) - shared,
+                                       hidden_b.sum(axis=1) - shared, shared)]
+    hits = np.flatnonzero(forced)
+    if not hits.size:
+        return None
+    pair = hits[0]
+    cells_a = set(nearby[first[pair]][hidden_a[pair]].tolist())
+    cells_b = set(nearby[second[pair]][hidden_b[pair]].tolist())
+    bits = int(forced[pair])
+    for bit, cells, action in ((A_SAFE, cells_a - cells_b, "j"), (B_SAFE, cells_b - cells_a, "j"),
+                               (SHARED_SAFE, cells_a & cells_b, "j"), (A_MINES, cells_a - cells_b, "f"),
+                               (B_MINES, cells_b - cells_a, "f"), (SHARED_MINES, cells_a & cells_b, "f")):
+        if bits & bit:
+            return choice(sorted(cells)), action
+    return None
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    table = build_table()
+    np.save(TABLE_FILE, table)
+    print(f"{np.count_nonzero(table)} of {table.size} patterns force cells, built in "
+          f"{time.perf_counter() - start:.2f} s, {os.path.getsize(TABLE_FILE)} bytes in {TABLE_FILE}")
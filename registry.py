@@ -0,0 +1,38 @@
+# engines, views and bots by name, each imported only when selected, e.g. load('view', 'cli'), see launcher.py
+from importlib import import_module
+
+REGISTRY = {  # kind: name: 'module:attribute'
+    'engine': {
+        'minefield': 'engine:MineField',
+    },
+    'view': {
+        'cli': 'ui_ro_cli:CLIViewReadOnly',
+        'excel': 'ui_excel:ExcelViewController',  # Excel itself only once a view is created, see ui_excel.ComBackend
+        'headless': 'ui_headless:HeadlessView',
+    },
+    'bot': {
+        'demo': 'bot_strategy:demo_bot',
+        'frontier': 'bot_strategy:frontier_bot',
+        'frontier_batch': 'bot_strategy:frontier_batch_bot',
+    },
+}
+
+
+def register(kind: str, name: str, spec: str) -> None:
+    """Adds a plugin, e.g. register('bot', 'mine', 'my_bots:mine'), its module imported on load"""
+    assert ':' in spec, f"Expected 'module:attribute', got {spec!r}"
+    REGISTRY[kind][name] = spec
+
+
+def resolve(kind: str, name: str) -> str:
+    """'module:attribute' of a registered name, or the name itself if already such a spec (an unregistered plugin)"""
+    if name in REGISTRY[kind]:
+        return REGISTRY[kind][name]
+    assert ':' in name, f"Unknown {kind} {name!r}, choose from {', '.join(REGISTRY[kind])} or give 'module:attribute'"
+    return name
+
+
+def load(kind: str, name: str) -> object:
+    """The selected engine, view or bot, importing its module (only) now"""
+    module, _, attribute = resolve(kind, name).partition(':')
+    return getattr(import_module(module), attribute)
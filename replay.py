@@ -0,0 +1,77 @@
+# replays move logs (see movelog.py) straight through the engine, without any view, checking their final states, e.g.
+# `python replay.py logs/*.mlog`, or in lockstep batches of same-size games `python replay.py --batch 1000 logs/*.mlog`
+import argparse
+import json
+import sys
+import time
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+from engine import MineField, BatchMineField
+from movelog import FinalState, GameLog, INPUTS, final_state, read_games
+
+
+def replay_game(game: GameLog) -> FinalState:
+    field = MineField(w=game.w, h=game.h, mines=game.mines, seed=game.seed)
+    field.complete_field_init()
+    for record in game.moves.tolist():
+        field.cell_action(record >> 2, INPUTS[record & 3])
+    return final_state(field)
+
+
+def replay_batch(games: list[GameLog]) -> list[FinalState]:
+    """Games of the same size and mines in lockstep, the i-th move of each in one BatchMineField step. Moves after a
+     game is over are not played (MVC_Mines_Controller does not log any)"""
+    field = BatchMineField(w=games[0].w, h=games[0].h, mines=games[0].mines, seeds=[game.seed for game in games])
+    records = np.full((len(games), max(game.moves.size for game in games)), -1, dtype=np.int64)  # -1: no move
+    for board, game in enumerate(games):
+        records[board, :game.moves.size] = game.moves
+    for moves in records.T:
+        field.step(np.maximum(moves, 0) >> 2, np.where(moves >= 0, moves & 3, -1))
+    return [FinalState(int(status), int(flags_left), int(hidden_safe), zlib.crc32(visible))
+            for status, flags_left, hidden_safe, visible in zip(field.status, field.flags_left, field.hidden_safe,
+                                                                field.visible)]
+
+
+def replay(paths: list[str], batch: int = 0) -> dict:
+    """Replays all games of the log files (streamed), one by one, or batch games of the same size at a time"""
+    games = moves = unfinished = 0
+    mismatched, pending = [], defaultdict(list)  # (path, game number); games waiting for a batch, by size
+
+    def check(batch_games: list[tuple[str, int, GameLog]], finals: list[FinalState]) -> None:
+        for (path, number, game), final in zip(batch_games, finals):
+            if game.final is not None and final != game.final:
+                mismatched.append((path, number))
+
+    start = time.perf_counter()
+    for path in paths:
+        for number, game in enumerate(read_games(path)):
+            games, moves = games + 1, moves + game.moves.size
+            unfinished += game.final is None
+            if not batch:
+                check([(path, number, game)], [replay_game(game)])
+                continue
+            same_size = pending[game.w, game.h, game.mines]
+            same_size.append((path, number, game))
+            if len(same_size) == batch:
+                check(same_size, replay_batch([game for _, _, game in same_size]))
+                same_size.clear()
+    for same_size in pending.values():
+        if same_size:
+            check(same_size, replay_batch([game for _, _, game in same_size]))
+    seconds = time.perf_counter() - start
+    return {'games': games, 'moves': moves, 'seconds': round(seconds, 3), 'moves_per_s': round(moves / seconds),
+            'unfinished': unfinished, 'mismatched': len(mismatched), 'first_mismatches': mismatched[:10]}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay move logs without a view and verify their final states")
+    parser.add_argument('logs', nargs='+', help="move log files, see movelog.py")
+    parser.add_argument('--batch', type=int, default=0, help="games of the same size replayed together (0: one by one)")
+    args = parser.parse_args()
+
+    report = replay(args.logs, batch=args.batch)
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if report['mismatched'] else 0)
@@ -0,0 +1,239 @@
+# many games behind one process, e.g. `python server.py serve --port 8765` (JSON lines over TCP), or measure it with
+# `python server.py load --sessions 20000 --moves 50000 --max-live 1000`
+import argparse
+import asyncio
+import json
+import os
+import secrets
+import time
+import tracemalloc
+import zlib
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from random import Random
+
+import numpy as np
+
+from engine import MineField, CellChanges, GLYPHS, HIDDEN
+from mvc import MVC_Mines_Controller
+
+
+class DirectoryStore(MutableMapping):
+    """Snapshots (bytes) by session, one file each in a directory, e.g. to keep evicted sessions out of memory"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, session: int) -> str:
+        return os.path.join(self.path, f"{session}.mfs")
+
+    def __getitem__(self, session: int) -> bytes:
+        try:
+            with open(self._file(session), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            raise KeyError(session) from None
+
+    def __setitem__(self, session: int, snapshot: bytes) -> None:
+        with open(self._file(session), 'wb') as f:
+            f.write(snapshot)
+
+    def __delitem__(self, session: int) -> None:
+        try:
+            os.remove(self._file(session))
+        except FileNotFoundError:
+            raise KeyError(session) from None
+
+    def __iter__(self):
+        return (int(name[:-4]) for name in os.listdir(self.path) if name.endswith('.mfs'))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class SessionManager:
+    """
+    Many seeded MineField games by session id. Only the max_live most recently played ones are kept as MineField
+     objects, the others as compressed snapshots (see MineField.snapshot, ~3 bits per cell before compression) in
+     store, a dict unless given (e.g. a DirectoryStore), and restored on their next use. Sessions not played for some
+     time can be evicted early, see evict_idle.
+    """
+
+    def __init__(self, max_live: int = 1000, store: MutableMapping | None = None):
+        self.max_live = max_live
+        self.store = {} if store is None else store
+        self.live = OrderedDict()  # session: field, least recently played first
+        self.last_played = {}  # session: time.monotonic() of its last use, for live sessions
+        self.next_session = 0
+        self.restored = self.evicted = 0
+
+    def new_game(self, w: int, h: int, mines: int, seed: int | None = None) -> int:
+        """Seeded game (a random seed if None), raises ValueError for a seed its snapshot cannot store"""
+        if seed is not None and not (isinstance(seed, int) and 0 <= seed < 2**63):
+            raise ValueError(f"Seed {seed!r} is not an int in [0, 2**63)")
+        field = MineField(w=w, h=h, mines=mines, seed=secrets.randbits(63) if seed is None else seed)
+        field.complete_field_init()
+        session, self.next_session = self.next_session, self.next_session + 1
+        self._keep(session, field)
+        return session
+
+    def field(self, session: int) -> MineField:
+        """Session's game, restored from its snapshot if evicted (raises KeyError for an unknown session)"""
+        if session in self.live:
+            self.live.move_to_end(session)
+            self.last_played[session] = time.monotonic()
+            return self.live[session]
+        field = MineField.restore(zlib.decompress(self.store.pop(session)))
+        self.restored += 1
+        self._keep(session, field)
+        return field
+
+    def move(self, session: int, cell_idx: int, action: str) -> CellChanges:
+        return self.field(session).cell_action(cell_idx=cell_idx, user_input=action)
+
+    def end(self, session: int) -> None:
+        if self.live.pop(session, None) is not None:
+            del self.last_played[session]
+        else:
+            del self.store[session]
+
+    def evict_idle(self, idle_seconds: float) -> int:
+        """Snapshots the sessions not played for idle_seconds, returns how many"""
+        evicted, oldest = 0, time.monotonic() - idle_seconds
+        while self.live and self.last_played[next(iter(self.live))] <= oldest:
+            self._evict(next(iter(self.live)))
+            evicted += 1
+        if evicted > len(self.live):  # dicts keep their size when emptied
+            self.live, self.last_played = OrderedDict(self.live), dict(self.last_played)
+        return evicted
+
+    def _keep(self, session: int, field: MineField) -> None:
+        self.live[session] = field
+        self.last_played[session] = time.monotonic()
+        while len(self.live) > self.max_live:
+            self._evict(next(iter(self.live)))
+
+    def _evict(self, session: int) -> None:
+        self.store[session] = zlib.compress(self.live[session].snapshot(), 1)  # bitmasks are mostly runs
+        del self.live[session], self.last_played[session]  # only once snapshotted, not to lose the game
+        self.evicted += 1
+
+    def handle(self, request: dict) -> dict:
+        """Request (e.g. decoded JSON) to response: ops new (w, h, mines, seed optional), move (session, cell,
+         action as in engine.ACTIONS), view (session) and end (session). Raises ValueError for a seed out of range, a
+         cell off the grid or a move in a finished game"""
+        match request.get('op'):
+            case 'new':
+                return {'session': self.new_game(request['w'], request['h'], request['mines'], request.get('seed'))}
+            case 'move':
+                field, cell = self.field(request['session']), int(request['cell'])
+                if not 0 <= cell < field.w * field.h:
+                    raise ValueError(f"Cell {cell} is off the {field.w}x{field.h} grid")
+                if field.game_over:
+                    raise ValueError(f"Game {request['session']} is over ({field.reaction.name})")
+                changes = self.move(request['session'], cell, request['action'])
+                return {'idxs': changes.idxs.tolist(), 'values': ''.join(GLYPHS[changes.values].tolist()),
+                        **self._status(field)}
+            case 'view':
+                field = self.field(request['session'])
+                return {'visible': ''.join(GLYPHS[field.visible].tolist()), **self._status(field)}
+            case 'end':
+                self.end(request['session'])
+                return {}
+        raise ValueError(f"Unknown op {request.get('op')!r}")
+
+    @staticmethod
+    def _status(field: MineField) -> dict:
+        return {'flags_left': field.flags_left, 'status': field.reaction.name}
+
+
+async def serve(manager: SessionManager, host: str = '127.0.0.1', port: int = 8765,
+                idle_timeout: float | None = None) -> None:
+    """One JSON request per line, one JSON response per line (with 'error' if it failed). With an idle_timeout
+     (seconds), sessions not played for that long are snapshotted, checked every tenth of it"""
+    async def handle_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        async for line in reader:
+            try:
+                response = manager.handle(json.loads(line))
+            except (KeyError, ValueError, TypeError, AssertionError) as e:
+                response = {'error': repr(e)}
+            writer.write(json.dumps(response).encode() + b'\n')
+            await writer.drain()
+        writer.close()
+
+    async def evict_idle() -> None:
+        while True:
+            await asyncio.sleep(idle_timeout / 10)
+            manager.evict_idle(idle_timeout)
+
+    server = await asyncio.start_server(handle_client, host, port)
+    evicting = None if idle_timeout is None else asyncio.create_task(evict_idle())
+    async with server:
+        try:
+            await server.serve_forever()
+        finally:
+            if evicting is not None:
+                evicting.cancel()
+
+
+def run_load(sessions: int, moves: int, max_live: int, difficulty: int = 3, seed: int = 0) -> dict:
+    """
+    Local load: memory of sessions all live and all snapshotted (traced allocations), then moves per second with at
+     most max_live live sessions, each move to a random session (mostly a restore if max_live << sessions), opening
+     a random hidden cell; a finished game is replaced by a new one
+    """
+    rows, cols, mines = MVC_Mines_Controller.presets[difficulty]
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    manager = SessionManager(max_live=sessions)
+    ids = [manager.new_game(cols, rows, mines, seed=seed + i) for i in range(sessions)]
+    live_bytes = tracemalloc.get_traced_memory()[0] - baseline
+    manager.evict_idle(0)
+    snapshot_bytes = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    manager.max_live, rng = max_live, Random(seed)
+    manager.restored = 0
+    start = time.perf_counter()
+    for _ in range(moves):
+        slot = rng.randrange(sessions)
+        field = manager.field(ids[slot])
+        hidden = np.flatnonzero(field.visible == HIDDEN)
+        manager.move(ids[slot], int(hidden[rng.randrange(hidden.size)]), 'j')
+        if field.game_over:
+            manager.end(ids[slot])
+            ids[slot] = manager.new_game(cols, rows, mines, seed=rng.randrange(2**63))
+    seconds = time.perf_counter() - start
+    return {'sessions': sessions, 'board': f"{rows}x{cols}", 'mines': mines,
+            'live_bytes_per_session': round(live_bytes / sessions),
+            'live_sessions_per_gb': round(2**30 / live_bytes * sessions),
+            'snapshot_bytes_per_session': round(snapshot_bytes / sessions),
+            'snapshot_sessions_per_gb': round(2**30 / snapshot_bytes * sessions),
+            'moves': moves, 'max_live': max_live, 'moves_per_s': round(moves / seconds),
+            'restores_per_move': round(manager.restored / moves, 3)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Host many minesweeper games in one process, or measure it")
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve_parser = commands.add_parser('serve', help="JSON lines over TCP, see SessionManager.handle")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8765)
+    serve_parser.add_argument('--max-live', type=int, default=1000)
+    serve_parser.add_argument('--store', help="directory to keep evicted sessions in (default: memory)")
+    serve_parser.add_argument('--idle-timeout', type=float,
+                              help="seconds after which an unplayed session is evicted (default: only beyond max-live)")
+    load_parser = commands.add_parser('load', help="local load generator, prints a JSON report")
+    load_parser.add_argument('--sessions', type=int, default=20_000)
+    load_parser.add_argument('--moves', type=int, default=50_000)
+    load_parser.add_argument('--max-live', type=int, default=1000)
+    load_parser.add_argument('--difficulty', type=int, default=3, choices=MVC_Mines_Controller.presets)
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        store = DirectoryStore(args.store) if args.store else None
+        asyncio.run(serve(SessionManager(max_live=args.max_live, store=store), host=args.host, port=args.port,
+                          idle_timeout=args.idle_timeout))
+    else:
+        print(json.dumps(run_load(args.sessions, args.moves, args.max_live, args.difficulty), indent=2))
@@ -0,0 +1,55 @@
+# FrontierSolver's mine probabilities, counted exactly and sampled, against brute force enumeration of small frontiers,
+# run with `python -m pytest`
+import random
+from itertools import combinations
+
+import pytest
+
+from bot_strategy import mine_probabilities
+
+
+def random_frontier(rng: random.Random, n_hidden: int = 14) -> tuple[list[tuple[set, int]], int, int]:
+    """Constraints of digits on overlapping windows of hidden cells, all satisfied by a random placement of mines"""
+    mines = set(rng.sample(range(n_hidden), rng.randint(2, n_hidden // 2)))
+    constraints = []
+    for _ in range(rng.randint(3, 9)):
+        start = rng.randrange(n_hidden)
+        cells = set(rng.sample(range(start, min(n_hidden, start + 6)), min(n_hidden - start, rng.randint(1, 5))))
+        constraints.append((cells, len(cells & mines)))
+    return constraints, n_hidden, len(mines)
+
+
+def brute_force(constraints: list[tuple[set, int]], n_hidden: int, mines_left: int) -> list[float]:
+    """Mine probability of every hidden cell, over all placements of mines_left mines that satisfy the constraints"""
+    mined, placements = [0] * n_hidden, 0
+    for placed in map(set, combinations(range(n_hidden), mines_left)):
+        if all(len(cells & placed) == need for cells, need in constraints):
+            placements += 1
+            for idx in placed:
+                mined[idx] += 1
+    return [count / placements for count in mined]
+
+
+def estimated(constraints: list[tuple[set, int]], n_hidden: int, mines_left: int, **kwargs) -> tuple[list, bool]:
+    probabilities, interior, exact = mine_probabilities(constraints, n_hidden, mines_left, **kwargs)
+    return [probabilities.get(idx, interior) for idx in range(n_hidden)], exact
+
+
+def test_exact_probabilities() -> None:
+    rng = random.Random(0)
+    for _ in range(200):
+        frontier = random_frontier(rng, n_hidden=rng.randint(6, 14))
+        probabilities, exact = estimated(*frontier)
+        assert exact
+        assert probabilities == pytest.approx(brute_force(*frontier), abs=1e-12)
+
+
+def test_sampled_probabilities() -> None:
+    """Unbiased: errors shrink with more samples (here within a few standard errors of 3000 samples)"""
+    rng = random.Random(1)
+    random.seed(1)  # of the sampler's draws
+    for _ in range(40):
+        frontier = random_frontier(rng)
+        probabilities, exact = estimated(*frontier, max_states=0, samples=3000)  # every component sampled
+        assert not exact
+        assert probabilities == pytest.approx(brute_force(*frontier), abs=0.06)
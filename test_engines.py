@@ -0,0 +1,84 @@
+# MineField, BatchMineField and ChunkedMineField play the same seeded random moves (opens, chords, flags, marks) to
+# the same states and counters, run with `python -m pytest`
+from random import Random
+
+import numpy as np
+import pytest
+
+from engine import MineField, BatchMineField, ACTIONS, HIDDEN, FLAGGED
+from engine_chunked import ChunkedMineField
+
+
+def random_move(field: MineField, rng: Random) -> tuple[int, str]:
+    """A move on a field's current state: mostly opening hidden cells and chording opened digits, with enough flags
+     on mines (and some wrong ones) for chords to open cells, and marks and clears in between"""
+    visible = field.visible
+    hidden, digits = np.flatnonzero(visible & HIDDEN), np.flatnonzero((0 < visible) & (visible < 9))
+    kind = rng.random()
+    if kind < 0.25 and digits.size:
+        return int(rng.choice(digits)), 'j'
+    if kind < 0.45 and (mines := np.flatnonzero((field.underneath == 9) & (visible == HIDDEN))).size:
+        return int(rng.choice(mines)), 'f'
+    cell = int(rng.choice(hidden if hidden.size else range(visible.size)))
+    return cell, rng.choices(['j', 'f', '?', ' '], weights=[4, 2, 1, 1])[0]
+
+
+@pytest.mark.parametrize('w, h, mines', [(9, 9, 10), (16, 16, 40), (30, 16, 99), (5, 23, 12)])
+def test_batch_matches_single_games(w: int, h: int, mines: int) -> None:
+    seeds, rng = list(range(24)), Random(w * h)
+    fields = [MineField(w=w, h=h, seed=seed) for seed in seeds]
+    for field in fields:
+        field.complete_field_init(mines)
+    batch = BatchMineField(w=w, h=h, mines=mines, seeds=seeds)
+    for _ in range(200):
+        moves = [random_move(field, rng) if not field.game_over else (0, None) for field in fields]
+        batch.step(np.array([cell for cell, _ in moves]),
+                   np.array([-1 if action is None else ACTIONS[action] for _, action in moves]))
+        for field, (cell, action) in zip(fields, moves):
+            if action is not None:
+                field.cell_action(cell, action)
+        np.testing.assert_array_equal(batch.visible, [field.visible for field in fields])
+        for counter in ('flags_left', 'hidden_safe', 'correct_flags', 'wrong_flags'):
+            assert getattr(batch, counter).tolist() == [getattr(field, counter) for field in fields], counter
+        status = {MineField.emoticons.GAME: BatchMineField.PLAYING, MineField.emoticons.WON: BatchMineField.WON,
+                  MineField.emoticons.LOST: BatchMineField.LOST}
+        assert batch.status.tolist() == [status[field.reaction] for field in fields]
+        if batch.game_over:
+            break
+
+
+@pytest.mark.parametrize('w, h, tile, seed', [(9, 9, 4, 0), (16, 16, 5, 1), (30, 16, 7, 2), (23, 5, 3, 3)])
+def test_chunked_matches_minefield(w: int, h: int, tile: int, seed: int) -> None:
+    rng = Random(seed)
+    for game in range(12):
+        chunked = ChunkedMineField(w=w, h=h, density=0.15, seed=seed * 100 + game, tile=tile)
+        mines = np.flatnonzero([chunked.underneath_at(idx) == 9 for idx in range(w * h)])
+        field = MineField(w=w, h=h, seed=0)
+        field.spread_mines = lambda n_mines: mines  # the chunked field's mines
+        field.complete_field_init(chunked.n_mines)
+        while not field.game_over:
+            cell, action = random_move(field, rng)
+            expected, changes = field.cell_action(cell, action), chunked.cell_action(cell, action)
+            visible = chunked.visible_window(0, 0, h, w).ravel()
+            for counter in ('flags_left', 'hidden_safe', 'correct_flags', 'wrong_flags', 'game_over', 'reaction'):
+                assert getattr(chunked, counter) == getattr(field, counter), counter
+            if field.reaction == MineField.emoticons.LOST:  # only explored tiles show their mines
+                explored = np.isin([chunked.locate(idx)[0] for idx in range(w * h)], list(chunked.slot_of))
+                np.testing.assert_array_equal(visible[explored], field.visible[explored])
+                assert np.isin(field.visible[~explored], [HIDDEN, 9]).all()
+            else:
+                np.testing.assert_array_equal(visible, field.visible)
+                np.testing.assert_array_equal(np.sort(changes.idxs), np.sort(expected.idxs))
+                np.testing.assert_array_equal(changes.values[np.argsort(changes.idxs)],
+                                              expected.values[np.argsort(expected.idxs)])
+
+
+def test_finished_games_do_not_change() -> None:
+    field = MineField(w=9, h=9, seed=0)
+    field.complete_field_init(10)
+    field.cell_action(int(field.mined[0]), 'j')
+    visible, flags_left = field.visible.copy(), field.flags_left
+    for cell, action in [(0, 'j'), (1, 'f'), (2, '?'), (int(field.mined[1]), 'f'), (int(field.mined[1]), 'j')]:
+        field.cell_action(cell, action)
+    np.testing.assert_array_equal(field.visible, visible)
+    assert field.flags_left == flags_left and field.visible[field.mined[1]] != HIDDEN | FLAGGED
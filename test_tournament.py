@@ -0,0 +1,20 @@
+# seeded bot games of tournament.py with move logs, replayed by replay.py to the same final states, run with
+# `python -m pytest`
+import glob
+import os
+
+import pytest
+
+from replay import replay
+from tournament import run_tournament
+
+
+@pytest.mark.parametrize('bot', ['demo', 'frontier', 'frontier_batch'])
+def test_logged_tournament_replays(bot: str, tmp_path) -> None:
+    report = run_tournament(bot, games=6, difficulties=(1, 2), workers=2, chunk=3, log_dir=str(tmp_path))
+    assert [summary['games'] for summary in report['difficulties'].values()] == [6, 6]
+    logs = sorted(glob.glob(os.path.join(tmp_path, '*.mlog')))
+    assert len(logs) == 4  # one per batch of games
+    for batch in (0, 4):
+        replayed = replay(logs, batch=batch)
+        assert replayed['games'] == 12 and replayed['unfinished'] == 0 and replayed['mismatched'] == 0
@@ -0,0 +1,104 @@
+# ExcelViewController and its user input on the in-process fake Excel (ui_excel_fake.py), run with `python -m pytest`
+import time
+from functools import partial
+
+import numpy as np
+import pytest
+
+from engine import MineField, CellChanges, GLYPHS, HIDDEN
+from mvc import MVC_Mines_Controller
+from ui_excel import ExcelViewController
+from ui_excel_fake import FakeExcelBackend, ScriptedUser
+
+
+def displayed(view: ExcelViewController) -> np.ndarray:
+    """The view's mirror as cell codes' glyphs, i.e. with the cells never written (empty) as hidden ones"""
+    return np.where(view.mirror == '', GLYPHS[HIDDEN], view.mirror).ravel()
+
+
+def fake_view(w: int, h: int, events: bool = True, seed: int = 0) -> tuple[ExcelViewController, MineField]:
+    field = MineField(w=w, h=h, seed=seed)
+    view = ExcelViewController(w, h, field.complete_field_init(w * h // 6), backend=FakeExcelBackend(events=events))
+    view.format_grid()
+    return view, field
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_changed_blocks_cover_exactly_the_changed_cells(seed: int) -> None:
+    view, _ = fake_view(w=23, h=17)
+    rng = np.random.default_rng(seed)
+    idxs = rng.choice(view.w * view.h, size=rng.integers(1, view.w * view.h), replace=False)
+    covered = np.zeros(view.w * view.h, dtype=int)
+    for top, left, bottom, right in view.changed_blocks(idxs):
+        covered.reshape(view.h, view.w)[top:bottom + 1, left:right + 1] += 1
+    assert covered.max() == 1  # no cell written twice
+    np.testing.assert_array_equal(np.flatnonzero(covered), np.sort(idxs))  # nor any unchanged cell
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_refresh_writes_match_the_mirror(seed: int) -> None:
+    view, field = fake_view(w=30, h=16, seed=seed)
+    rng = np.random.default_rng(seed)
+    typing = int(rng.integers(view.w * view.h))  # a cell the user is editing, only written if a move changes it
+    view.backend.sheet[view.y0 + typing // view.w, view.x0 + typing % view.w] = 'j'
+    others = np.arange(view.w * view.h) != typing
+    for _ in range(20):
+        hidden = np.flatnonzero(field.visible == HIDDEN)
+        if field.game_over or not hidden.size:
+            break
+        changes = field.cell_action(int(rng.choice(hidden)), str(rng.choice(['j', 'f', '?'])))
+        view.backend.calls.clear()
+        view.refresh_grid(changes)
+        assert view.backend.calls['Value2.set'] == len(view.changed_blocks(changes.idxs))
+        shown = view.read_grid().ravel()
+        np.testing.assert_array_equal(displayed(view)[others], GLYPHS[field.visible][others])
+        np.testing.assert_array_equal(shown[others], view.mirror.ravel()[others])
+        assert shown[typing] == ('j' if field.visible[typing] == HIDDEN else view.mirror.flat[typing])
+
+
+@pytest.mark.parametrize('events', [True, False], ids=['events', 'polling'])
+def test_user_input(events: bool) -> None:
+    view, _ = fake_view(w=9, h=9, events=events)
+    assert view.user_input.evented == events
+    assert view.user_input.next_changes(timeout=0.05) is None
+    view.refresh_grid(CellChanges(idxs=np.array([3, 4]), values=np.array([1, 2], dtype=np.uint8)))
+    assert view.user_input.next_changes(timeout=0.05) is None  # the view's own writes are not input
+
+    user = ScriptedUser(view.backend, [(0.02, view.y0 + 2, view.x0 + 5, 'j'), (0.02, view.y0 - 1, view.x0, 'j')])
+    user.start()
+    assert view.user_input.next_changes(timeout=2) == [(2 * 9 + 5, 'j')]
+    view.refresh_grid(CellChanges(idxs=np.array([2 * 9 + 5]), values=np.array([3], dtype=np.uint8)))  # played
+    user.join()
+    assert view.user_input.next_changes(timeout=0.1) is None  # off the grid, e.g. the panel
+
+    view.backend.sheet[view.y0:view.y0 + 2, view.x0] = 'f'  # e.g. pasted, a single change event
+    view.backend.notify(view.y0, view.x0, view.backend.sheet[view.y0:view.y0 + 2, view.x0:view.x0 + 1])
+    assert view.user_input.next_changes(timeout=1) == [(0, 'f'), (9, 'f')]
+
+
+@pytest.mark.parametrize('events', [True, False], ids=['events', 'polling'])
+def test_scripted_game(events: bool) -> None:
+    backend = FakeExcelBackend(events=events)
+    rows, cols, mines = MVC_Mines_Controller.presets[2]
+    controller = MVC_Mines_Controller(cols=cols, rows=rows, mines=mines, engine=MineField,
+                                      ui=partial(ExcelViewController, backend=backend), seed=0)
+    view, field = controller.view, controller.model
+
+    def script():  # opens safe cells, each once the previous one is rendered
+        for _ in range(5):
+            y, x = divmod(int(np.flatnonzero((field.visible == HIDDEN) & (field.underneath != 9))[0]), cols)
+            yield 0.01, view.y0 + y, view.x0 + x, 'j'
+            while view.mirror[y, x] in ('', ' ') and not field.game_over:
+                time.sleep(0.001)
+
+    user = ScriptedUser(backend, script())
+    user.start()
+    moves = 0
+    while user.is_alive() and moves < 5:
+        if move := controller.get_user_move():
+            controller.apply_move(*move)
+            moves += 1
+    user.join(timeout=2)
+    assert moves == 5 and field.reaction != MineField.emoticons.LOST
+    np.testing.assert_array_equal(displayed(view), GLYPHS[field.visible])
+    np.testing.assert_array_equal(view.read_grid(), view.mirror)
@@ -0,0 +1,148 @@
+# headless bot games, e.g. `python tournament.py --games 1000 --bot demo --out results.json`
+import argparse
+import json
+import os
+import platform
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Callable
+
+import numpy as np
+
+from board_bank import BoardBank
+from engine import MineField, CellChanges
+from metrics import Metrics
+from mvc import MVC_Mines_Controller
+from registry import load
+from ui_headless import HeadlessView
+
+
+def load_bot(spec: str) -> Callable:
+    """Bot strategy by its name in the registry (see registry.py) or a 'module:function' spec, e.g. 'demo' or
+     'bot_strategy:demo_bot'"""
+    return load('bot', spec)
+
+
+def play_game(bot_strategy: Callable, rows: int, cols: int, mines: int, seed: int,
+              max_moves: int | None = None, move_log: BinaryIO | None = None, start: int | None = None,
+              metrics: Metrics | None = None) -> dict:
+    """Plays one seeded game without rendering, timing the bot (its decision and observe of the changes) and the
+     engine's move separately (ns), its moves appended to move_log if given (see movelog.py). A start cell is opened
+     first, e.g. a bank board's"""
+    random.seed(seed)  # bots may pick randomly among equally good moves
+    controller = MVC_Mines_Controller(cols=cols, rows=rows, mines=mines, engine=MineField, ui=HeadlessView, seed=seed,
+                                      move_log=move_log, metrics=metrics)
+    if start is not None:  # before the bot follows the moves, it sees the grid as opened at its first one
+        controller.apply_move(start, 'j')
+    get_move = controller._move_source(bot_strategy)
+    observed = {'ns': 0}  # a stateful bot's observe time during the last move, the bot's share of it
+    if (observe := controller.observe_changes) is not None:
+        def timed_observe(changes: CellChanges) -> None:
+            t0 = time.perf_counter_ns()
+            observe(changes)
+            observed['ns'] += time.perf_counter_ns() - t0
+        controller.observe_changes = timed_observe
+    bot_ns, engine_ns = [], []
+    max_moves = max_moves or 4 * rows * cols  # a bot that does not progress (e.g. flips a flag) still ends
+    while not controller.model.game_over and len(bot_ns) < max_moves:
+        t0 = time.perf_counter_ns()
+        move = get_move()
+        decided, observed['ns'] = time.perf_counter_ns(), 0
+        if isinstance(move, list):  # a batch of moves, counted as one
+            controller.apply_moves(move)
+        else:
+            controller.apply_move(*move)
+        engine_ns.append(time.perf_counter_ns() - decided - observed['ns'])
+        bot_ns.append(decided - t0 + observed['ns'])
+    if move_log is not None:
+        controller.move_log.finish(controller.model)  # if it ran out of moves
+    return {'seed': seed, 'won': controller.model.reaction == MineField.emoticons.WON, 'moves': len(bot_ns),
+            'bot_ns': bot_ns, 'engine_ns': engine_ns, 'metrics': metrics}
+
+
+def _play_games(bot_spec: str, rows: int, cols: int, mines: int, seeds: list[int],
+                log_dir: str | None = None, bank_dir: str | None = None, metrics: bool = False) -> list[dict]:
+    bot_strategy = load_bot(bot_spec)  # imported in the worker process
+    boards = [(seed, None) for seed in seeds] if bank_dir is None else \
+        [BoardBank(bank_dir).board(cols, rows, mines, index=seed) for seed in seeds]  # no-guess ones instead
+    if log_dir is None:
+        return [play_game(bot_strategy, rows=rows, cols=cols, mines=mines, seed=seed, start=start,
+                          metrics=Metrics() if metrics else None) for seed, start in boards]
+    with open(os.path.join(log_dir, f"{rows}x{cols}_{mines}_{seeds[0]}.mlog"), 'wb') as move_log:  # one per batch
+        return [play_game(bot_strategy, rows=rows, cols=cols, mines=mines, seed=seed, move_log=move_log, start=start,
+                          metrics=Metrics() if metrics else None) for seed, start in boards]
+
+
+def _latency_us(timings_ns: list[int]) -> dict:
+    if not timings_ns:
+        return {}
+    p50, p95, p99 = np.percentile(timings_ns, [50, 95, 99]) / 1e3
+    return {'p50': round(p50, 2), 'p95': round(p95, 2), 'p99': round(p99, 2),
+            'mean': round(np.mean(timings_ns) / 1e3, 2)}
+
+
+def summarize(games: list[dict]) -> dict:
+    bot_ns = [t for game in games for t in game['bot_ns']]
+    engine_ns = [t for game in games for t in game['engine_ns']]
+    summary = {
+        'games': len(games),
+        'win_rate': sum(game['won'] for game in games) / len(games),
+        'moves_per_game': sum(game['moves'] for game in games) / len(games),
+        'bot_latency_us': _latency_us(bot_ns),
+        'engine_latency_us': _latency_us(engine_ns),
+    }
+    if games[0]['metrics'] is not None:  # of all games together
+        metrics = Metrics()
+        for game in games:
+            metrics.merge(game['metrics'])
+        summary['metrics'] = metrics.to_dict()
+    return summary
+
+
+def run_tournament(bot_spec: str, games: int, difficulties: tuple = (1, 2, 3), first_seed: int = 0,
+                   workers: int | None = None, chunk: int = 50, log_dir: str | None = None,
+                   bank_dir: str | None = None, metrics: bool = False) -> dict:
+    """Plays the same seeded games per difficulty preset (see MVC_Mines_Controller.presets) across processes, logging
+     their moves to files in log_dir if given (see replay.py). With a bank_dir (see board_bank.py), game i is the
+     bank's i-th no-guess board, started from its safe start. With metrics, each summary adds the games' phase
+     histograms and counters, see metrics.py."""
+    if log_dir is not None:
+        os.makedirs(log_dir, exist_ok=True)
+    seeds = list(range(first_seed, first_seed + games))
+    results = {'bot': bot_spec, 'first_seed': first_seed, 'bank': bank_dir, 'python': platform.python_version(),
+               'numpy': np.__version__, 'difficulties': {}}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for difficulty in difficulties:
+            rows, cols, mines = MVC_Mines_Controller.presets[difficulty]
+            start = time.perf_counter()
+            batches = [seeds[i:i + chunk] for i in range(0, len(seeds), chunk)]
+            played = pool.map(_play_games, *zip(*[(bot_spec, rows, cols, mines, batch, log_dir, bank_dir, metrics)
+                                                  for batch in batches]))
+            summary = summarize([game for batch in played for game in batch])
+            summary.update(rows=rows, cols=cols, mines=mines, seconds=round(time.perf_counter() - start, 3))
+            results['difficulties'][difficulty] = summary
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play seeded games with a bot strategy and report its performance")
+    parser.add_argument('--bot', default='demo', help="registered bot (see registry.py) or 'module:function'")
+    parser.add_argument('--games', type=int, default=100, help="number of games per difficulty")
+    parser.add_argument('--difficulty', type=int, nargs='+', default=[1, 2, 3], choices=MVC_Mines_Controller.presets)
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first game, the others follow it")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--out', help="JSON file to write results to (default: print them)")
+    parser.add_argument('--log', help="directory to write move logs of the games to, see replay.py")
+    parser.add_argument('--bank', help="directory of no-guess boards to play instead, see board_bank.py")
+    parser.add_argument('--metrics', action='store_true', help="add per-move phase metrics, see metrics.py")
+    args = parser.parse_args()
+
+    report = run_tournament(args.bot, games=args.games, difficulties=tuple(args.difficulty), first_seed=args.seed,
+                            workers=args.workers, log_dir=args.log, bank_dir=args.bank,
+                            metrics=args.metrics)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
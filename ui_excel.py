@@ -1,27 +1,131 @@
 import sys  # without this Excel complains of "Unlicensed product"
+import queue
 import time
 from numbers import Integral as int_like  # also numpy's ints
+from typing import Callable
+import numpy as np
+from engine import CellChanges, GLYPHS
 from ui_ro_cli import View
 
-import clr  # provide own path (may depend on your Excel installation):
-clr.AddReference(r"C:\Program Files (x86)\Microsoft Office\root\Office16\DCF\Microsoft.Office.Interop.Excel.dll")
-from System import Activator, Type, Reflection
-from Microsoft.Office.Interop import Excel
+
+class ComBackend:
+    """Excel through COM interop, imported on first use so that the module (and e.g. its fake, see ui_excel_fake.py)
+     also loads without Excel. Gives the view a worksheet, its cells and conversions of 2D values"""
+
+    def __init__(self):
+        import clr  # provide own path (may depend on your Excel installation):
+        clr.AddReference(r"C:\Program Files (x86)\Microsoft Office\root\Office16\DCF"
+                         r"\Microsoft.Office.Interop.Excel.dll")
+        from System import Activator, Array, Object, Type, Reflection
+        from Microsoft.Office.Interop import Excel
+        self.Excel, self.Reflection, self.Array, self.Object = Excel, Reflection, Array, Object
+        self.Activator, self.Type = Activator, Type
+
+    def new_worksheet(self) -> tuple["Application", "Worksheet"]:
+        excel = self.Activator.CreateInstance(self.Type.GetTypeFromProgID("Excel.Application"))
+        workbook = excel.Workbooks.Add()
+        return excel, self.Excel.Worksheet(workbook.Worksheets[1])
+
+    def cell(self, ws: "Worksheet", row: int_like, col: int_like) -> "Cells":
+        return ws.GetType().InvokeMember("Cells", self.Reflection.BindingFlags.GetProperty, None, ws,
+                                         [int(row + 1), int(col + 1)])  # .NET will error with e.g. numpy.int32
+
+    def array2d(self, values: np.ndarray) -> "object[,]":
+        """2D .NET array, which a multi-cell Range takes as Value2 in a single call"""
+        array = self.Array.CreateInstance(self.Object, *values.shape)
+        for (r, c), value in np.ndenumerate(values):
+            array[r, c] = value
+        return array
+
+    def values(self, value2: "object[,]") -> list:
+        return list(value2)  # row by row
+
+    def subscribe_changes(self, ws: "Worksheet", on_change: Callable) -> bool:
+        """Calls on_change(top, left, rows, cols, values) on every change of the worksheet's cells, with the 0-based
+         top left cell of the changed range, its size and values row by row. Returns False if events are unavailable"""
+        def changed(target: "Range") -> None:
+            rows, cols = target.Rows.Count, target.Columns.Count
+            values = [target.Value2] if rows * cols == 1 else self.values(target.Value2)
+            on_change(target.Row - 1, target.Column - 1, rows, cols, values)
+
+        try:
+            self.change_handler = self.Excel.DocEvents_ChangeEventHandler(changed)  # referenced, to stay subscribed
+            self.Excel.DocEvents_Event(ws).Change += self.change_handler
+            return True
+        except Exception as e:
+            print(f"No worksheet change events, polling the grid instead: {e}")
+            return False
+
+
+def cell_text(value: object) -> str:
+    """Cell's Value2 as the user sees it: empty as '', and numbers (Excel turns digits into e.g. 1.0) as '1'"""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class GridInput:
+    """
+    User's input in the grid, as a queue of changes (list of cell index and value, a move if only one) for the
+     controller. Fed by the worksheet's change events if the backend has them, else by a diff of the whole grid (one
+     read) against the view's mirror, polled every min_interval after activity, and up to twice less often per idle
+     poll, up to max_interval. Cells the view wrote itself (as in its mirror) are not input.
+    """
+
+    def __init__(self, view: "ExcelViewController", min_interval: float = 0.02, max_interval: float = 0.5):
+        self.view = view
+        self.min_interval, self.max_interval = min_interval, max_interval
+        self.interval = min_interval
+        self.changes = queue.Queue()  # events may come from another (COM) thread
+        self.evented = view.backend.subscribe_changes(view.ws, self._on_change)
+
+    def _on_change(self, top: int, left: int, rows: int, cols: int, values: list) -> None:
+        view = self.view
+        ys, xs = np.divmod(np.arange(rows * cols), cols)
+        ys, xs = ys + top - view.y0, xs + left - view.x0
+        on_grid = (0 <= ys) & (ys < view.h) & (0 <= xs) & (xs < view.w)
+        idxs = ys[on_grid] * view.w + xs[on_grid]
+        texts = [cell_text(value) for value in np.array(values, dtype=object)[on_grid]]
+        changes = [(idx, text) for idx, text in zip(idxs.tolist(), texts) if text != view.mirror.flat[idx]]
+        if changes:
+            self.changes.put(changes)
+
+    def next_changes(self, timeout: float) -> list[tuple[int, str]] | None:
+        """Waits up to timeout (seconds) for the user to change cells of the grid"""
+        if self.evented:
+            try:
+                return self.changes.get(timeout=timeout)
+            except queue.Empty:
+                return None
+        deadline = time.perf_counter() + timeout
+        while True:
+            current = self.view.read_grid()
+            changed = np.flatnonzero(current != self.view.mirror)
+            if changed.size:
+                self.interval = self.min_interval
+                return list(zip(changed.tolist(), current.flat[changed].tolist()))
+            if (remaining := deadline - time.perf_counter()) <= 0:
+                return None
+            time.sleep(min(self.interval, remaining))
+            self.interval = min(self.interval * 2, self.max_interval)
 
 
 class ExcelViewController(View):  # inherit from generic Minefield ViewController?
 
-    def __init__(self, cols, rows, content_view, clock_loc: tuple | None = None, flagc_loc: tuple | None = None):
-        super().__init__(cols, rows, content_view)
-        excel_type = Type.GetTypeFromProgID("Excel.Application")
-        self.excel = Activator.CreateInstance(excel_type)
-        workbook = self.excel.Workbooks.Add()
-        self.ws = Excel.Worksheet(workbook.Worksheets[1])
+    def __init__(self, cols, rows, content_view, clock_loc: tuple | None = None, flagc_loc: tuple | None = None,
+                 backend: "ComBackend | None" = None):
+        self.backend = ComBackend() if backend is None else backend
+        self.excel, self.ws = self.backend.new_worksheet()
 
         self.start_rowcol, self.end_rowcol = self.get_grid_rowcol_range_from_specs(w=cols, h=rows)
         self.y0, self.x0 = self.start_rowcol
+        self.mirror = None  # grid as displayed in Excel (normalized, see read_grid), to not read it back after writes
+        self.panel_shown = {}  # values of clock, flag counter and smile cells, written only when they change
 
         self.format_score_time(clock_loc, flagc_loc)
+        super().__init__(cols, rows, content_view)  # after the panel cells exist, as it sets (renders) their values
 
     def format_score_time(self, clock_loc: tuple | None, flagc_loc: tuple | None) -> None:
         clock_loc = self.end_rowcol[1] + 1, self.y0 - 1 if clock_loc is None else clock_loc
@@ -34,17 +138,21 @@ class ExcelViewController(View):  # inherit from generic Minefield ViewControlle
     def __setattr__(self, name, value):
         if name == 'clock':  # custom setter-only, which renders time in addition to setting it
             # self.__dict__[name] = value  # not really needed, can just pass through
-            self.set_xl_value(self.clock_cell, value=int(value))
+            self._set_panel_value(name, self.clock_cell, value=int(value))
         elif name == 'flag_counter':  # render flag count
-            self.set_xl_value(self.flagc_cell, value=int(value))
+            self._set_panel_value(name, self.flagc_cell, value=int(value))
         elif name == 'smile':  # render flag count
-            self.set_xl_value(self.smile_cell, value=str(value))
+            self._set_panel_value(name, self.smile_cell, value=str(value))
         else:
             super().__setattr__(name, value)  # default behavior for other attributes
 
+    def _set_panel_value(self, name: str, cell_range: "Range", value: int | str) -> None:
+        if self.panel_shown.get(name) != value:  # e.g. the clock is set every move, but changes once a second
+            self.set_xl_value(cell_range, value)
+            self.panel_shown[name] = value
+
     def get_xl_cell(self, row: int_like, col: int_like) -> "Cells":
-        return self.ws.GetType().InvokeMember("Cells", Reflection.BindingFlags.GetProperty, None, self.ws,
-                                              [int(row + 1), int(col + 1)])  # .NET will error with e.g. numpy.int32
+        return self.backend.cell(self.ws, row, col)
 
     def get_xl_range(self, top_left: "Cells" = None, bottom_right: "Cells" = None,
                      coord: tuple[int_like] | None = None) -> "Range":
@@ -60,7 +168,9 @@ class ExcelViewController(View):  # inherit from generic Minefield ViewControlle
     def get_grid_rowcol_range_from_specs(w: int, h: int, vpanel: int = 1, hpanel: int = 1) -> tuple:
         return (hpanel, vpanel), (hpanel + h - 1, vpanel + w - 1)
 
-    def set_xl_value(self, cell_range: "Range", value: int | str) -> None:
+    def set_xl_value(self, cell_range: "Range", value: "int | str | object[,]") -> None:
+        if self.metrics is not None:
+            self.metrics.count('view_writes')  # COM calls, each a round trip to Excel
         retries, max_retries = 0, 60
         while retries < max_retries:
 
@@ -75,13 +185,14 @@ class ExcelViewController(View):  # inherit from generic Minefield ViewControlle
                 time.sleep(1)  # wait more before retrying, user could be e.g. editing cell
         raise RuntimeError("Couldn't set Excel cell value")
 
-    def format_grid(self) -> "Value2":
+    def format_grid(self) -> np.ndarray:
         self.start_cell = self.get_xl_cell(*self.start_rowcol)  # ws.get_Cells or ws.Cells error
         self.end_cell = self.get_xl_cell(*self.end_rowcol)
 
         self.grid_range = grid = self.get_xl_range(top_left=self.start_cell, bottom_right=self.end_cell)
         grid.set_ColumnWidth(2.14)  # default row height (20 px)
 
+        Excel = self.backend.Excel
         borders = grid.Borders
         borders.LineStyle = Excel.XlLineStyle.xlContinuous
         thicker = 4  # Excel.XlBorderWeight.xlThick == 4
@@ -92,25 +203,50 @@ class ExcelViewController(View):  # inherit from generic Minefield ViewControlle
         self.excel.Visible = True
         grid.HorizontalAlignment = Excel.XlHAlign.xlHAlignCenter
         grid.VerticalAlignment = Excel.XlVAlign.xlVAlignCenter
-        return self.read_grid()
-
-    def set_grid(self, values: "Value2") -> None:
-        while not self.excel.Ready:
-            time.sleep(0.1)
-        self.grid_range.Value2 = values
-
-    def read_grid(self) -> "Value2":
-        return self.grid_range.Value2
-
-    def refresh_grid(self, cells_coords: list[tuple]) -> "Value2":
-        return self._reveal_all_content_on_grid(cells_coords)  # to-do: more efficient
-
-    def _reveal_all_content_on_grid(self, cells_coords: list[tuple]) -> "Value2":
-        """Set each affected cell value in Spreadsheet one at a time and return the whole grid"""
-        for xy in cells_coords:
-            self._reveal_content_in_cell(*xy)
-        return self.read_grid()  # to-do: only updated cells?
-
-    def _reveal_content_in_cell(self, x, y) -> None:
-        range1x1 = self.get_xl_range(coord=(x, y)).Cells[self.y0, self.x0]  # adjust for grid loc.
-        self.set_xl_value(range1x1, str(self.content_view[y, x]))
+        self.mirror = self.read_grid()
+        self.user_input = GridInput(self)
+        return self.mirror
+
+    def set_grid(self, values: np.ndarray) -> None:
+        self.mirror = np.array(values, dtype=object)  # first, so that the change is not taken for user's input
+        self.set_xl_value(self.grid_range, self.backend.array2d(self.mirror))
+
+    def read_grid(self) -> np.ndarray:
+        """Grid (rows x cols) as the user sees it, see cell_text"""
+        values = [cell_text(value) for value in self.backend.values(self.grid_range.Value2)]
+        return np.array(values, dtype=object).reshape(self.h, self.w)
+
+    def refresh_grid(self, changes: CellChanges) -> np.ndarray:
+        """Writes the changed cells block by block (see changed_blocks) and returns the grid as now displayed"""
+        self.mirror.flat[changes.idxs] = GLYPHS[changes.values].tolist()
+        self._write_blocks(self.changed_blocks(changes.idxs))
+        return self.mirror
+
+    def changed_blocks(self, idxs: np.ndarray) -> list[tuple[int, int, int, int]]:
+        """
+        Covers the changed cells with rectangles (top, left, bottom, right; inclusive) of changed cells only, so that
+         each is one COM write and no other cell (e.g. one the user is typing in) is overwritten: horizontal runs of
+         changed cells in each row, merged with the same run in the rows below, e.g. a few dozen for a flood fill.
+        """
+        changed = np.zeros((self.h, self.w + 2), dtype=np.int8)  # padded to close runs at the edges
+        ys, xs = np.divmod(np.asarray(idxs), self.w)
+        changed[ys, xs + 1] = 1
+        edges = np.diff(changed, axis=1)
+        rows, starts = np.nonzero(edges == 1)  # run starts (x) per row, in reading order
+        _, ends = np.nonzero(edges == -1)  # run ends, exclusive
+        blocks, open_blocks = [], {}  # runs (left, right) continuing down from the row above: block's top row
+        for row, left, right in zip(rows.tolist(), starts.tolist(), (ends - 1).tolist()):
+            top, below = open_blocks.pop((left, right), (row, row - 1))
+            if below != row - 1:  # a gap of rows, the earlier block is complete
+                blocks.append((top, left, below, right))
+                top = row
+            open_blocks[left, right] = top, row
+        blocks.extend((top, left, bottom, right) for (left, right), (top, bottom) in open_blocks.items())
+        return blocks
+
+    def _write_blocks(self, blocks: list[tuple[int, int, int, int]]) -> None:
+        """One 2D Value2 write per block, from the mirror"""
+        for top, left, bottom, right in blocks:
+            block_range = self.get_xl_range(top_left=self.get_xl_cell(self.y0 + top, self.x0 + left),
+                                            bottom_right=self.get_xl_cell(self.y0 + bottom, self.x0 + right))
+            self.set_xl_value(block_range, self.backend.array2d(self.mirror[top:bottom + 1, left:right + 1]))
@@ -0,0 +1,155 @@
+# in-process stand-in for Excel, to run (and count the COM calls of) ExcelViewController without Windows and Excel, e.g.
+# ExcelViewController(cols, rows, content_view, backend=FakeExcelBackend()), or see benchmarks.py excel_refresh
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+from typing import Callable, Iterable
+
+import numpy as np
+
+
+class FakeExcelBackend:
+    """
+    Backend of ExcelViewController (like ui_excel.ComBackend) on a worksheet held in a numpy array. Every member access
+     that would be a cross-process COM call with Excel is counted in calls, by member name. Values are stored as Excel
+     does for Value2: numeric strings as floats, empty ones as None.
+    """
+    Excel = SimpleNamespace(  # the few interop enums the view uses
+        XlLineStyle=SimpleNamespace(xlContinuous=1),
+        XlBordersIndex=SimpleNamespace(xlEdgeLeft=7, xlEdgeTop=8, xlEdgeBottom=9, xlEdgeRight=10),
+        XlHAlign=SimpleNamespace(xlHAlignCenter=-4108),
+        XlVAlign=SimpleNamespace(xlVAlignCenter=-4108),
+    )
+
+    def __init__(self, rows: int = 256, cols: int = 256, events: bool = True):
+        self.sheet = np.full((rows, cols), None, dtype=object)
+        self.calls = Counter()
+        self.events, self.listeners = events, []
+
+    def new_worksheet(self) -> tuple["FakeApplication", "FakeWorksheet"]:
+        return FakeApplication(self), FakeWorksheet(self)
+
+    def cell(self, ws: "FakeWorksheet", row: int, col: int) -> tuple[int, int]:
+        self.calls['Cells'] += 1
+        return int(row), int(col)
+
+    def array2d(self, values: np.ndarray) -> np.ndarray:
+        return np.array(values, dtype=object)
+
+    def values(self, value2: np.ndarray | object) -> list:
+        return np.ravel(value2).tolist()  # row by row, also a single cell's value
+
+    def subscribe_changes(self, ws: "FakeWorksheet", on_change: Callable) -> bool:
+        if self.events:
+            self.listeners.append(on_change)
+        return self.events
+
+    def notify(self, top: int, left: int, values: np.ndarray) -> None:
+        """Change event, as Excel raises it for any edit, by the user or through COM"""
+        for on_change in self.listeners:
+            on_change(top, left, *values.shape, values.ravel().tolist())
+
+    def type_value(self, row: int, col: int, value: str) -> None:
+        """User's edit of a cell (0-based row and column of the sheet), not a COM call"""
+        self.sheet[row, col] = self.to_excel(value)
+        self.notify(row, col, self.sheet[row:row + 1, col:col + 1])
+
+    @staticmethod
+    def to_excel(value: object) -> object:
+        if isinstance(value, str):
+            if value == '':
+                return None
+            try:
+                return float(value)
+            except ValueError:
+                return value
+        return value
+
+    def com_calls(self) -> int:
+        return sum(self.calls.values())
+
+
+class FakeComObject:
+    def __init__(self, backend: FakeExcelBackend):
+        self.__dict__['backend'] = backend
+
+    def __setattr__(self, name, value):  # e.g. Visible, LineStyle, HorizontalAlignment
+        if isinstance(getattr(type(self), name, None), property):
+            return object.__setattr__(self, name, value)  # counted by the property, e.g. Value2
+        self.backend.calls[name] += 1
+        self.__dict__[name] = value
+
+    def _call(self, name: str) -> None:
+        self.backend.calls[name] += 1
+
+
+class FakeApplication(FakeComObject):
+    @property
+    def Ready(self) -> bool:
+        self._call('Ready')
+        return True
+
+
+class FakeWorksheet(FakeComObject):
+    def get_Range(self, top_left: tuple[int, int], bottom_right: tuple[int, int]) -> "FakeRange":
+        self._call('get_Range')
+        return FakeRange(self.backend, top_left, bottom_right)
+
+
+class FakeRange(FakeComObject):
+    def __init__(self, backend: FakeExcelBackend, top_left: tuple[int, int], bottom_right: tuple[int, int]):
+        super().__init__(backend)
+        (top, left), (bottom, right) = top_left, bottom_right
+        self.__dict__['area'] = np.s_[top:bottom + 1, left:right + 1]
+
+    @property
+    def Value2(self) -> np.ndarray | object:
+        self._call('Value2.get')
+        values = self.backend.sheet[self.area]
+        return values[0, 0] if values.size == 1 else values.copy()
+
+    @Value2.setter
+    def Value2(self, value: np.ndarray | object) -> None:
+        self._call('Value2.set')
+        area = self.backend.sheet[self.area]
+        if isinstance(value, np.ndarray):
+            assert value.shape == area.shape, f"{value.shape} values for a {area.shape} range"
+            area[...] = [[self.backend.to_excel(v) for v in row] for row in value.tolist()]
+        else:
+            area[...] = self.backend.to_excel(value)
+        self.backend.notify(self.area[0].start, self.area[1].start, area)
+
+    @property
+    def Borders(self) -> "FakeBorders":
+        self._call('Borders')
+        return FakeBorders(self.backend)
+
+    def set_ColumnWidth(self, width: float) -> None:
+        self._call('ColumnWidth')
+
+
+class FakeBorders(FakeComObject):
+    def get_Item(self, index: int) -> "FakeBorders":
+        self._call('Borders.Item')
+        return FakeBorders(self.backend)
+
+    def set_Weight(self, weight: int) -> None:
+        self._call('Weight')
+
+
+class ScriptedUser(threading.Thread):
+    """Types a script of (delay in seconds, row, column, value) edits into the fake sheet from its own thread, like a
+     user would, noting when each cell was typed (typed_at, perf_counter seconds by (row, column)). Being iterated
+     lazily, a script may choose each edit from the game's state at the time"""
+
+    def __init__(self, backend: FakeExcelBackend, script: Iterable[tuple[float, int, int, str]]):
+        super().__init__(daemon=True)
+        self.backend, self.script = backend, script
+        self.typed_at = {}
+
+    def run(self) -> None:
+        for delay, row, col, value in self.script:
+            time.sleep(delay)
+            self.typed_at[row, col] = time.perf_counter()
+            self.backend.type_value(row, col, value)
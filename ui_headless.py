@@ -0,0 +1,12 @@
+from engine import CellChanges
+from ui_ro_cli import View
+
+
+class HeadlessView(View):
+    """Renders nothing, e.g. for bots playing many games (see tournament.py); grid is the engine's visible one"""
+
+    def format_grid(self):
+        return self.content_view
+
+    def refresh_grid(self, changes: CellChanges):
+        return self.content_view
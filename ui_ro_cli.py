@@ -1,9 +1,16 @@
 import numpy as np
 import os
-from time import sleep
+import sys
+import time
+from typing import TextIO
+
+from engine import CellChanges, GLYPHS
 
 
 class View:
+    metrics = None  # set by Metrics.instrument, to count writes to the output
+    frame_pending = False  # changes held back (e.g. by a frame rate limit) until the next frame, see flush
+
     def __init__(self, cols: int, rows: int, content_view: np.ndarray) -> None:
         self.content_view = content_view
         self.flag_counter, self.clock, self.smile = 0, 0, '  '
@@ -13,40 +20,103 @@ class View:
         """Prepare initial UI"""
         pass
 
-    def refresh_grid(self, cells_coords: list[tuple]):
+    def refresh_grid(self, changes: CellChanges):
+        pass
+
+    def flush(self):
+        """Render what is still pending, e.g. at the end of a game"""
         pass
 
 
 class CLIViewReadOnly(View):
+    """
+    Renders to a terminal by ANSI escape codes: the whole screen once (format_grid), then only the cells that changed
+     and the top panel, each run of adjacent changed cells in a row after a single cursor move. Frames are throttled
+     to fps (None: a frame per refresh), changes in between accumulate and are drawn by the next refresh, clock tick
+     or flush (see frame_pending); the clock redraws only the top panel.
+     Output goes to out, e.g. an io.StringIO for a headless view (frames and bytes_written count what was written).
+    """
 
     empty = f"\N{middle dot}"
+    glyphs = np.where(GLYPHS == ' ', empty, GLYPHS)  # of the engine's cell codes
     indent = ' ' * 5
 
-    def __init__(self, cols, rows, content_view, clock_loc: tuple | None = None, flagc_loc: tuple | None = None):
-        super().__init__(cols, rows, content_view)
+    def __init__(self, cols, rows, content_view, clock_loc: tuple | None = None, flagc_loc: tuple | None = None,
+                 fps: float | None = 30, out: TextIO | None = None):
+        self.out = sys.stdout if out is None else out
+        if self.out is sys.stdout and os.name == 'nt':
+            os.system('')  # enables escape codes in Windows console
+        self.frame_interval = 1 / fps if fps else 0
+        self.last_frame, self.frames, self.bytes_written = -float('inf'), 0, 0
+        self.dirty, self.panel_dirty, self.shown = np.zeros(cols * rows, dtype=bool), True, None
         self.spacing = cols + 2*2  # top_panel: flag, smilee, time counter, each ~3 chars, equally spaced
+        super().__init__(cols, rows, content_view)
 
-    def display_top_panel(self):
+    def format_top_panel(self) -> str:
         w1, w2, spc = str(self.flag_counter), str(self.clock), self.spacing
-        formatted_line = f" {w1:<{max(0, spc - len(w1))}}{self.smile:^{len(self.smile)}}{w2:>{max(0, spc - len(w2))}}"
-        print(formatted_line)
+        return f" {w1:<{max(0, spc - len(w1))}}{self.smile:^{len(self.smile)}}{w2:>{max(0, spc - len(w2))}}"
 
     def format_grid(self):
-        """Prepare initial UI. Also, print it. Can make starting screen different here."""
+        """Prepare initial UI. Also, print it (whole screen). Can make starting screen different here."""
+        self.shown = np.full(self.w * self.h, self.empty)
+        rows = (self.indent + " ".join(self.shown[r * self.w:(r + 1) * self.w]) for r in range(self.h))
+        self._write("\x1b[2J\x1b[H" + "\n".join([self.format_top_panel(), *rows]) + "\n")  # clear screen, go home
+        self.panel_dirty = False
         self.refresh_grid()
 
-    def refresh_grid(self, cells_coords: list[tuple] | None = None):
-        """Prints the grid (to-do: update only required parts, use framework, etc)."""
-        sleep(0.5)
-        os.system('cls||clear')
-        pretty_grid = np.where(np.isin(self.content_view, ['', ' ']), self.empty, self.content_view)
-        self.display_top_panel()
-        for r in range(self.h):
-            print(self.indent + " ".join(pretty_grid[r, :]))
+    def refresh_grid(self, changes: CellChanges | None = None):
+        """Draws the changed cells (all if not given) in the next frame"""
+        if changes is None:
+            self.dirty[:] = True
+        else:
+            self.dirty[changes.idxs] = True
+        self._frame()
+
+    def flush(self):
+        self._frame(force=True)
+
+    def _frame(self, force: bool = False) -> None:
+        now = time.perf_counter()
+        if self.shown is None:
+            return
+        if not force and now - self.last_frame < self.frame_interval:
+            self.frame_pending = True  # drawn by the next refresh, clock tick or flush
+            return
+        self.frame_pending = False
+        parts = []
+        if self.panel_dirty:
+            parts.append(f"\x1b[1;1H{self.format_top_panel()}\x1b[K")  # and clear the rest of the line
+            self.panel_dirty = False
+        idxs = np.flatnonzero(self.dirty)
+        self.dirty[idxs] = False
+        glyphs = self.glyphs[self.content_view.ravel()[idxs]]
+        redraw = glyphs != self.shown[idxs]
+        idxs, glyphs = idxs[redraw], glyphs[redraw]
+        self.shown[idxs] = glyphs
+        ys, xs = np.divmod(idxs, self.w)
+        run_starts = np.flatnonzero((np.diff(idxs, prepend=-2) != 1) | (xs == 0))  # runs of adjacent cells in a row
+        for start, end in zip(run_starts.tolist(), np.append(run_starts[1:], idxs.size).tolist()):
+            row, col = int(ys[start]) + 2, len(self.indent) + 2 * int(xs[start]) + 1  # 1-based, below the top panel
+            parts.append(f"\x1b[{row};{col}H{' '.join(glyphs[start:end])}")
+        if parts:
+            self._write("".join(parts) + f"\x1b[{self.h + 2};1H")  # cursor below the grid
+        self.last_frame = now
+
+    def _write(self, frame: str) -> None:
+        self.out.write(frame)
+        self.out.flush()
+        self.frames += 1
+        self.bytes_written += len(frame.encode())
+        if self.metrics is not None:
+            self.metrics.count('view_writes')
 
     def __setattr__(self, name, value):
-        if name == 'clock':  # custom setter-only, which renders time in addition to setting it
-            self.__dict__[name] = int(value)  # not really needed, can just pass through
-            # self.refresh_grid()  # temporary, to-do: update only req'd parts
+        if name in ('clock', 'flag_counter', 'smile'):  # custom setter, which renders the top panel in addition
+            value = int(value) if name == 'clock' else value
+            if changed := self.__dict__.get(name) != value:
+                self.__dict__[name] = value
+                self.panel_dirty = True
+            if name == 'clock' and (changed or self.frame_pending):  # as the grid redraws with the others anyway
+                self._frame()
         else:
             super().__setattr__(name, value)  # default behavior for other attributes